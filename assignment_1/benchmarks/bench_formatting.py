@@ -0,0 +1,77 @@
+"""Formatting numbers in Python vs passing DISPLAY_NUMBER_FORMATS as column_config.
+
+Both paths end with the frame st.dataframe sends to the browser as Arrow bytes. The
+old path turns every cell into a string with Series.apply first; the dashboard keeps
+the numeric columns and builds a NumberColumn config, so the browser formats them.
+
+Usage (from assignment_1):
+    python benchmarks/bench_formatting.py --rows 50000
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+
+from benchmarks.common import time_call
+from dashboard_tabs import build_column_config
+
+FORMAT_CONFIG = {
+    'spend': 'currency',
+    'attributed_revenue': 'currency',
+    'roas': 'multiplier',
+    'ctr': 'percentage'
+}
+
+
+def format_with_apply(df, columns_to_format):
+    display_df = df.copy()
+    for col, format_type in columns_to_format.items():
+        if format_type == 'currency':
+            display_df[col] = display_df[col].apply(lambda x: f"${x:,.0f}")
+        elif format_type == 'percentage':
+            display_df[col] = display_df[col].apply(lambda x: f"{x:.2f}%")
+        elif format_type == 'multiplier':
+            display_df[col] = display_df[col].apply(lambda x: f"{x:.2f}x")
+    return display_df
+
+
+def apply_path(df):
+    return convert_pandas_df_to_arrow_bytes(format_with_apply(df, FORMAT_CONFIG))
+
+
+def column_config_path(df):
+    build_column_config(FORMAT_CONFIG)
+    return convert_pandas_df_to_arrow_bytes(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'campaign': [f"Campaign {i}" for i in range(args.rows)],
+        'spend': rng.uniform(0, 5e6, args.rows),
+        'attributed_revenue': rng.uniform(0, 2e7, args.rows),
+        'roas': rng.uniform(0, 8, args.rows),
+        'ctr': rng.uniform(0, 10, args.rows)
+    })
+
+    lambdas = time_call(lambda: apply_path(df), args.repeat)
+    column_config = time_call(lambda: column_config_path(df), args.repeat)
+
+    print(f"rows: {args.rows:,}")
+    print(f"apply + lambda : {lambdas * 1000:8.1f} ms ({len(apply_path(df)) / 2**20:.1f} MiB sent)")
+    print(f"column_config  : {column_config * 1000:8.1f} ms ({len(column_config_path(df)) / 2**20:.1f} MiB sent, "
+          f"{lambdas / column_config:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Cold vs warm load times for the columnar data cache.
+
+Usage (from assignment_1):
+    python benchmarks/bench_load_cache.py --scale 100
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import build_scaled_dataset, time_call
+from data_cache import clear_cache
+from data_loader import get_dataset_dir, read_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=100, help='Multiply channel rows by this factor')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='mmm-bench-')
+    dataset_dir = os.path.join(work_dir, 'dataset')
+    cache_dir = os.path.join(work_dir, 'cache')
+    os.makedirs(dataset_dir)
+
+    try:
+        build_scaled_dataset(get_dataset_dir(), dataset_dir, args.scale)
+
+        no_cache = time_call(lambda: read_data(dataset_dir, None), args.repeat)
+
+        def cold_load():
+            if os.path.isdir(cache_dir):
+                clear_cache(cache_dir)
+            return read_data(dataset_dir, cache_dir)
+
+        cold = time_call(cold_load, args.repeat)
+        warm = time_call(lambda: read_data(dataset_dir, cache_dir), args.repeat)
+
+        _, marketing_df = read_data(dataset_dir, cache_dir)
+        print(f"marketing rows: {len(marketing_df):,}")
+        print(f"csv only        : {no_cache * 1000:8.1f} ms")
+        print(f"cold (csv+write): {cold * 1000:8.1f} ms")
+        print(f"warm (mmap)     : {warm * 1000:8.1f} ms  ({no_cache / warm:.1f}x faster than csv)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
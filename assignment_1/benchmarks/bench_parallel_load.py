@@ -0,0 +1,68 @@
+"""Sequential vs thread vs process loading of N synthetic channel files.
+
+Usage (from assignment_1):
+    python benchmarks/bench_parallel_load.py --channels 8 --scale 50
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from benchmarks.common import time_call
+from config import DATA_FILES, INGESTION_SETTINGS
+from data_loader import get_dataset_dir, read_data
+
+
+def build_channel_files(source_dir, target_dir, n_channels, scale):
+    shutil.copy(os.path.join(source_dir, DATA_FILES['business']), target_dir)
+    template = pd.read_csv(os.path.join(source_dir, DATA_FILES['marketing']['Facebook']))
+    template = pd.concat([template] * scale, ignore_index=True)
+
+    marketing_files = {}
+    for i in range(n_channels):
+        channel = f"Channel{i + 1:02d}"
+        marketing_files[channel] = f"{channel}.csv"
+        template.to_csv(os.path.join(target_dir, marketing_files[channel]), index=False)
+
+    return marketing_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--channels', type=int, default=8)
+    parser.add_argument('--scale', type=int, default=50, help='Multiply rows per channel file by this factor')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='mmm-bench-')
+    try:
+        marketing_files = build_channel_files(get_dataset_dir(), work_dir, args.channels, args.scale)
+        INGESTION_SETTINGS['max_workers'] = args.workers
+
+        timings = {}
+        results = {}
+        for executor in [None, 'thread', 'process']:
+            INGESTION_SETTINGS['executor'] = executor
+            timings[executor] = time_call(lambda: read_data(work_dir, None, marketing_files), args.repeat)
+            results[executor] = read_data(work_dir, None, marketing_files)[1]
+
+        # The concat order must not depend on which file finishes first
+        for executor in ['thread', 'process']:
+            pd.testing.assert_frame_equal(results[None], results[executor])
+
+        print(f"{args.channels} channel files, {len(results[None]):,} rows, {os.cpu_count()} cores")
+        for executor, elapsed in timings.items():
+            speedup = timings[None] / elapsed
+            print(f"{str(executor or 'sequential'):10s}: {elapsed * 1000:8.1f} ms ({speedup:.1f}x)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
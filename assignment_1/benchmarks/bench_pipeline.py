@@ -0,0 +1,189 @@
+"""Time and peak memory of every dashboard pipeline stage on synthetic data, written to JSON.
+
+Scale N writes N times the bundled dataset's marketing rows (10 * N campaigns per channel over
+the same days). Pass --baseline with an earlier results file to flag stages that got slower.
+
+Usage (from assignment_1):
+    python benchmarks/bench_pipeline.py --scales 10 100 1000 --output results.json
+    python benchmarks/bench_pipeline.py --scales 10 100 --baseline results.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import generate_dataset
+from cube import build_marketing_cube
+from data_loader import read_data
+from insights import generate_insights
+from metrics import (
+    build_metric_index,
+    calculate_metrics,
+    create_executive_metrics,
+    calculate_channel_performance,
+    calculate_campaign_performance,
+    rank_campaigns,
+    calculate_tactic_performance
+)
+from visualizations import (
+    create_performance_trends_chart,
+    create_channel_roas_chart,
+    create_spend_allocation_chart,
+    create_margin_trend_chart,
+    create_cost_breakdown_chart,
+    create_efficiency_scatter_chart,
+    create_tactic_performance_chart
+)
+
+# Each stage reads earlier results from ctx and its own result is stored under its name
+STAGES = [
+    ('read_data', lambda ctx: read_data(ctx['dataset_dir'], None, ctx['marketing_files'])),
+    ('build_marketing_cube', lambda ctx: build_marketing_cube(ctx['read_data'][1])),
+    ('build_metric_index', lambda ctx: build_metric_index(ctx['read_data'][0], ctx['build_marketing_cube'])),
+    ('calculate_metrics', lambda ctx: calculate_metrics(ctx['read_data'][0], ctx['build_marketing_cube'])),
+    ('create_executive_metrics', lambda ctx: create_executive_metrics(ctx['build_metric_index'])),
+    ('calculate_channel_performance', lambda ctx: calculate_channel_performance(ctx['calculate_metrics'][1])),
+    ('calculate_campaign_performance', lambda ctx: calculate_campaign_performance(ctx['calculate_metrics'][1])),
+    ('rank_campaigns', lambda ctx: rank_campaigns(ctx['calculate_campaign_performance'])),
+    ('calculate_tactic_performance', lambda ctx: calculate_tactic_performance(ctx['calculate_metrics'][1])),
+    ('generate_insights',
+     lambda ctx: generate_insights(ctx['calculate_channel_performance'], ctx['create_executive_metrics'])),
+    ('create_performance_trends_chart', lambda ctx: create_performance_trends_chart(ctx['calculate_metrics'][0])),
+    ('create_channel_roas_chart', lambda ctx: create_channel_roas_chart(ctx['calculate_channel_performance'])),
+    ('create_spend_allocation_chart', lambda ctx: create_spend_allocation_chart(ctx['calculate_channel_performance'])),
+    ('create_margin_trend_chart', lambda ctx: create_margin_trend_chart(ctx['calculate_metrics'][0])),
+    ('create_cost_breakdown_chart',
+     lambda ctx: create_cost_breakdown_chart(ctx['create_executive_metrics'], ctx['calculate_metrics'][0])),
+    ('create_efficiency_scatter_chart', lambda ctx: create_efficiency_scatter_chart(ctx['calculate_metrics'][0])),
+    ('create_tactic_performance_chart', lambda ctx: create_tactic_performance_chart(ctx['calculate_tactic_performance']))
+]
+
+
+def measure_stage(fn, ctx, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(ctx)
+        timings.append(time.perf_counter() - start)
+
+    # A separate traced run, so tracemalloc overhead stays out of the timings
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    result = fn(ctx)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return result, {'seconds': min(timings), 'peak_bytes': peak}
+
+
+def run_scale(scale, days, repeat, seed):
+    work_dir = tempfile.mkdtemp(prefix='mmm-bench-')
+    try:
+        start = time.perf_counter()
+        marketing_files = generate_dataset(work_dir, days=days, campaigns=10 * scale, seed=seed)
+        generate_seconds = time.perf_counter() - start
+
+        ctx = {'dataset_dir': work_dir, 'marketing_files': marketing_files}
+        stages = {}
+        for name, fn in STAGES:
+            ctx[name], stages[name] = measure_stage(fn, ctx, repeat)
+
+        return {
+            'scale': scale,
+            'days': days,
+            'marketing_rows': len(ctx['read_data'][1]),
+            'cube_rows': len(ctx['build_marketing_cube']),
+            'generate_seconds': generate_seconds,
+            'stages': stages
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance, min_delta):
+    # Stages slower than the baseline by more than `tolerance` (a fraction) and `min_delta`
+    # seconds are regressions; the absolute floor keeps sub-millisecond noise out
+    previous = {run['scale']: run['stages'] for run in baseline['runs']}
+    regressions = []
+    for run in results['runs']:
+        for name, stage in run['stages'].items():
+            old = previous.get(run['scale'], {}).get(name)
+            if old is None or old['seconds'] <= 0:
+                continue
+            ratio = stage['seconds'] / old['seconds']
+            if ratio > 1 + tolerance and stage['seconds'] - old['seconds'] > min_delta:
+                regressions.append((run['scale'], name, old['seconds'], stage['seconds'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--days', type=int, default=120)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='Results file (default: pipeline-<commit>.json)')
+    parser.add_argument('--baseline', default=None, help='Earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown vs the baseline')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help='Ignore slowdowns smaller than this')
+    args = parser.parse_args()
+
+    results = {
+        'commit': git_commit(),
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'runs': []
+    }
+
+    for scale in args.scales:
+        run = run_scale(scale, args.days, args.repeat, args.seed)
+        results['runs'].append(run)
+
+        print(f"scale {scale}x: {run['marketing_rows']:,} marketing rows, {run['cube_rows']:,} cube rows")
+        for name, stage in run['stages'].items():
+            print(f"  {name:32s} {stage['seconds'] * 1000:10.1f} ms  peak {stage['peak_bytes'] / 2**20:8.1f} MiB")
+
+    output = args.output or f"pipeline-{results['commit'] or 'local'}.json"
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_delta_ms / 1000)
+        for scale, name, old, new, ratio in regressions:
+            print(f"REGRESSION scale {scale}x {name}: {old * 1000:.1f} ms -> {new * 1000:.1f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"no stage slower than the baseline by more than {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""Parity and latency/memory of the pandas and DuckDB query backends on synthetic data.
+
+Each backend is timed in its own process so peak RSS is measured independently. Every filter
+scenario then runs on both backends in one process and the metrics, channel, campaign and
+tactic frames are compared; any difference fails the run. With --format parquet DuckDB
+reads Parquet copies of the channel files; pandas always reads the CSVs.
+
+Usage (from assignment_1):
+    python benchmarks/bench_query_backend.py --scales 10 100 --format csv
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import duckdb_backend
+import metrics
+from benchmarks.synthetic_data import generate_dataset
+from cube import build_marketing_cube
+from data_loader import peak_rss_bytes, read_business_data, read_data
+
+BACKENDS = {'pandas': metrics, 'duckdb': duckdb_backend}
+PERFORMANCE = {
+    'channel': ('calculate_channel_performance', ['channel']),
+    'campaign': ('calculate_campaign_performance', ['channel', 'campaign']),
+    'tactic': ('calculate_tactic_performance', ['channel', 'tactic'])
+}
+
+
+def scenarios(business_df, channels):
+    first, last = business_df['date'].min(), business_df['date'].max()
+    recent = last - pd.Timedelta(days=29)
+    middle = (first + (last - first) / 2).normalize()
+    cases = [
+        ('all time', (None, 'All', None)),
+        ('last 30 days', (recent, 'All', None)),
+        ('custom range', (first + pd.Timedelta(days=14), 'All', middle))
+    ]
+    cases += [(channel, (None, channel, None)) for channel in channels]
+    cases.append((f"last 30 days, {channels[-1]}", (recent, channels[-1], None)))
+    # A range with no data at all
+    cases.append(('after last date', (last + pd.Timedelta(days=1), 'All', None)))
+    return cases
+
+
+def load_backend(backend, dataset_dir, marketing_files, parquet_files):
+    if backend == 'pandas':
+        business_df, marketing_df = read_data(dataset_dir, None, marketing_files)
+        return business_df, build_marketing_cube(marketing_df)
+    # DuckDB reads the channel files itself; only the business data goes through pandas
+    business_df = read_business_data(dataset_dir)
+    return business_df, duckdb_backend.connect_marketing(dataset_dir, parquet_files or marketing_files)
+
+
+def run_queries(backend, business_df, source, filters):
+    module = BACKENDS[backend]
+    combined_df, filtered = module.calculate_metrics(business_df, source, *filters)
+    results = {'metrics': combined_df}
+    for name, (fn, _) in PERFORMANCE.items():
+        results[name] = getattr(module, fn)(filtered)
+    # One column per channel; both backends name them the same but hold them in different index types
+    weekly_spend = module.calculate_weekly_channel_spend(filtered)
+    weekly_spend.columns = [str(channel) for channel in weekly_spend.columns]
+    results['weekly_spend'] = weekly_spend.reset_index()
+    return results
+
+
+def sorted_frame(frame, keys):
+    # Both backends order rows by channel, but may order campaigns and tactics within a channel differently
+    frame = frame.astype({key: str for key in keys if key != 'channel'})
+    return frame.sort_values(keys, kind='stable').reset_index(drop=True)
+
+
+def check_parity(dataset_dir, marketing_files, parquet_files, rtol):
+    loaded = {
+        backend: load_backend(backend, dataset_dir, marketing_files, parquet_files) for backend in BACKENDS
+    }
+    business_df = loaded['pandas'][0]
+    failures = []
+    for name, filters in scenarios(business_df, list(marketing_files)):
+        expected = run_queries('pandas', *loaded['pandas'], filters)
+        actual = run_queries('duckdb', *loaded['duckdb'], filters)
+        for frame_name in expected:
+            keys = PERFORMANCE[frame_name][1] if frame_name in PERFORMANCE else ['date']
+            try:
+                pd.testing.assert_frame_equal(
+                    sorted_frame(expected[frame_name], keys), sorted_frame(actual[frame_name], keys),
+                    check_dtype=False, check_categorical=False, rtol=rtol
+                )
+            except AssertionError as e:
+                failures.append(f"{name} / {frame_name}: {str(e).splitlines()[0]}")
+    return failures
+
+
+def run_backend(backend, dataset_dir, marketing_files, parquet_files, repeat):
+    # Child process: one backend, so its peak RSS is its own
+    start = time.perf_counter()
+    business_df, source = load_backend(backend, dataset_dir, marketing_files, parquet_files)
+    setup_seconds = time.perf_counter() - start
+
+    queries = {}
+    for name, filters in scenarios(business_df, list(marketing_files)):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run_queries(backend, business_df, source, filters)
+            timings.append(time.perf_counter() - start)
+        queries[name] = min(timings)
+
+    if backend == 'pandas':
+        held_bytes = int(source.memory_usage(deep=True).sum())
+    else:
+        held_bytes = int(source['connection'].execute(
+            "SELECT SUM(memory_usage_bytes) FROM duckdb_memory()"
+        ).fetchone()[0] or 0)
+
+    print(json.dumps({
+        'setup_seconds': setup_seconds,
+        'queries': queries,
+        'held_bytes': held_bytes,
+        'peak_rss_bytes': peak_rss_bytes()
+    }))
+
+
+def _write_parquet(work_dir, marketing_files):
+    parquet_files = {}
+    for channel, filename in marketing_files.items():
+        parquet_files[channel] = os.path.splitext(filename)[0] + '.parquet'
+        frame = pd.read_csv(os.path.join(work_dir, filename))
+        frame.to_parquet(os.path.join(work_dir, parquet_files[channel]), index=False)
+    return parquet_files
+
+
+def run_scale(scale, args):
+    work_dir = tempfile.mkdtemp(prefix='mmm-bench-')
+    try:
+        marketing_files = generate_dataset(work_dir, days=args.days, campaigns=10 * scale, seed=args.seed)
+        parquet_files = _write_parquet(work_dir, marketing_files) if args.format == 'parquet' else None
+        rows = args.days * 10 * scale * len(marketing_files)
+        print(f"scale {scale}x: {rows:,} marketing rows ({args.format})")
+
+        # Timed first: a child process starts with the peak RSS its parent had when it was started
+        results = {}
+        for backend in BACKENDS:
+            output = subprocess.run([
+                sys.executable, os.path.abspath(__file__), '--backend', backend, '--dataset-dir', work_dir,
+                '--marketing-files', json.dumps(marketing_files), '--parquet-files', json.dumps(parquet_files),
+                '--repeat', str(args.repeat)
+            ], check=True, capture_output=True, text=True).stdout
+            results[backend] = json.loads(output.strip().splitlines()[-1])
+
+        names = list(results['pandas']['queries'])
+        print(f"  {'':28s} {'pandas':>12s} {'duckdb':>12s}")
+        for label, key in [('setup', 'setup_seconds')]:
+            print(f"  {label:28s}" + ''.join(f" {results[b][key] * 1000:9.1f} ms" for b in BACKENDS))
+        for name in names:
+            print(f"  {name:28s}" + ''.join(f" {results[b]['queries'][name] * 1000:9.1f} ms" for b in BACKENDS))
+        for label, key in [('data held', 'held_bytes'), ('peak RSS', 'peak_rss_bytes')]:
+            print(f"  {label:28s}" + ''.join(f" {results[b][key] / 2**20:8.1f} MiB" for b in BACKENDS))
+
+        failures = check_parity(work_dir, marketing_files, parquet_files, args.rtol)
+        for failure in failures:
+            print(f"  MISMATCH {failure}")
+        if not failures:
+            print("  parity: all scenarios match")
+        return failures
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--days', type=int, default=120)
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rtol', type=float, default=1e-9, help='Relative tolerance of the parity check')
+    parser.add_argument('--backend', choices=list(BACKENDS), help=argparse.SUPPRESS)
+    parser.add_argument('--dataset-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--marketing-files', help=argparse.SUPPRESS)
+    parser.add_argument('--parquet-files', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_backend(
+            args.backend, args.dataset_dir, json.loads(args.marketing_files), json.loads(args.parquet_files),
+            args.repeat
+        )
+        return
+
+    if duckdb_backend.duckdb is None:
+        sys.exit("duckdb is not installed (pip install duckdb)")
+
+    failures = []
+    for scale in args.scales:
+        failures += run_scale(scale, args)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
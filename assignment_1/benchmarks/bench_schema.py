@@ -0,0 +1,71 @@
+"""Memory footprint and groupby latency of the typed marketing schema.
+
+Usage (from assignment_1):
+    python benchmarks/bench_schema.py --scale 100
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from benchmarks.common import build_scaled_dataset, time_call
+from config import DATA_FILES, COLUMN_MAPPINGS
+from data_loader import get_dataset_dir, memory_footprint, read_data
+from metrics import (
+    calculate_channel_performance,
+    calculate_campaign_performance,
+    calculate_tactic_performance
+)
+
+
+def read_untyped(dataset_dir):
+    marketing_dfs = []
+    for channel, filename in DATA_FILES['marketing'].items():
+        df = pd.read_csv(os.path.join(dataset_dir, filename))
+        df = df.rename(columns=COLUMN_MAPPINGS['marketing'])
+        df['channel'] = channel
+        marketing_dfs.append(df)
+    marketing_df = pd.concat(marketing_dfs, ignore_index=True)
+    marketing_df['date'] = pd.to_datetime(marketing_df['date'])
+    return marketing_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=100, help='Multiply channel rows by this factor')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='mmm-bench-')
+    try:
+        build_scaled_dataset(get_dataset_dir(), work_dir, args.scale)
+        frames = {
+            'untyped': read_untyped(work_dir),
+            'typed': read_data(work_dir, None)[1]
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    stages = {
+        'channel groupby': calculate_channel_performance,
+        'campaign groupby': calculate_campaign_performance,
+        'tactic groupby': calculate_tactic_performance
+    }
+
+    print(f"marketing rows: {len(frames['typed']):,}")
+    for name, df in frames.items():
+        print(f"{name:8s} memory: {memory_footprint(df) / 1024 ** 2:8.1f} MiB")
+
+    for stage, fn in stages.items():
+        untyped = time_call(lambda: fn(frames['untyped']), args.repeat)
+        typed = time_call(lambda: fn(frames['typed']), args.repeat)
+        print(f"{stage:17s}: {untyped * 1000:7.1f} ms -> {typed * 1000:7.1f} ms ({untyped / typed:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
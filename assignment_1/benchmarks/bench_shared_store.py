@@ -0,0 +1,79 @@
+"""Memory held by N concurrent sessions: per-session copies (st.cache_data) vs views of one shared store.
+
+st.cache_data keeps the pickled result and unpickles a new copy for every caller, which this
+replays with pickle; each session keeps its copy alive through the filtered frames it memoizes.
+The shared store freezes one copy and every session gets a shared_view of it.
+
+Usage (from assignment_1):
+    python benchmarks/bench_shared_store.py --scale 100 --sessions 1 10 50
+"""
+import argparse
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import generate_dataset
+from data_loader import load_dataset
+from shared_store import freeze, shared_view
+
+
+def session_copies(data, sessions):
+    blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    return blob, [pickle.loads(blob) for _ in range(sessions)]
+
+
+def session_views(data, sessions):
+    shared = freeze(data)
+    return shared, [shared_view(shared) for _ in range(sessions)]
+
+
+def measure(mode, build, sessions):
+    # Traced bytes held once every session has its data, including the cached original; the time
+    # covers handing the data to the sessions, not loading it
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    data = build()
+    start = time.perf_counter()
+    held = mode(data, sessions)
+    elapsed = time.perf_counter() - start
+    # The cache keeps only what the mode returned: the pickle, or the frozen original
+    del data
+    current = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del held
+    return current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=100, help='N times the bundled marketing rows')
+    parser.add_argument('--days', type=int, default=120)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 10, 50])
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='mmm-bench-')
+    try:
+        marketing_files = generate_dataset(work_dir, days=args.days, campaigns=10 * args.scale)
+        build = lambda: load_dataset(work_dir)
+        business_df, marketing_cube, _ = build()
+        print(f"scale {args.scale}x: {len(business_df):,} business rows, {len(marketing_cube):,} cube rows "
+              f"from {len(marketing_files)} channel files")
+
+        print(f"{'sessions':>8s} {'copies':>12s} {'shared':>12s} {'copies time':>12s} {'shared time':>12s}")
+        for sessions in args.sessions:
+            copies, copies_time = measure(session_copies, build, sessions)
+            shared, shared_time = measure(session_views, build, sessions)
+            print(f"{sessions:8d} {copies / 2**20:8.1f} MiB {shared / 2**20:8.1f} MiB "
+                  f"{copies_time * 1000:9.1f} ms {shared_time * 1000:9.1f} ms")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Peak memory and load time of full vs streaming marketing ingestion.
+
+Each mode runs in its own process so peak RSS is measured independently.
+
+Usage (from assignment_1):
+    python benchmarks/bench_streaming.py --scale 200 --chunk-size 100000
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import build_scaled_dataset
+from cube import build_marketing_cube
+from data_loader import get_dataset_dir, peak_rss_bytes, read_data, read_marketing_cube_streaming
+
+
+def run_mode(mode, dataset_dir, chunk_size):
+    start = time.perf_counter()
+    if mode == 'streaming':
+        marketing_cube, _ = read_marketing_cube_streaming(dataset_dir, chunk_size)
+    else:
+        _, marketing_df = read_data(dataset_dir)
+        marketing_cube = build_marketing_cube(marketing_df)
+    elapsed = time.perf_counter() - start
+
+    print(f"{mode:9s}: {elapsed * 1000:8.1f} ms, cube rows {len(marketing_cube):,}, "
+          f"peak RSS {peak_rss_bytes() / 1024 ** 2:7.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=200, help='Multiply channel rows by this factor')
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--mode', choices=['full', 'streaming'], help=argparse.SUPPRESS)
+    parser.add_argument('--dataset-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.dataset_dir, args.chunk_size)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix='mmm-bench-')
+    try:
+        build_scaled_dataset(get_dataset_dir(), work_dir, args.scale)
+        for mode in ['full', 'streaming']:
+            subprocess.run([
+                sys.executable, os.path.abspath(__file__), '--mode', mode,
+                '--dataset-dir', work_dir, '--chunk-size', str(args.chunk_size)
+            ], check=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
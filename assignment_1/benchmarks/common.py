@@ -0,0 +1,24 @@
+import os
+import time
+
+import pandas as pd
+
+from config import DATA_FILES
+
+
+def build_scaled_dataset(source_dir, target_dir, scale):
+    filenames = [DATA_FILES['business']] + list(DATA_FILES['marketing'].values())
+    for filename in filenames:
+        df = pd.read_csv(os.path.join(source_dir, filename))
+        if filename != DATA_FILES['business']:
+            df = pd.concat([df] * scale, ignore_index=True)
+        df.to_csv(os.path.join(target_dir, filename), index=False)
+
+
+def time_call(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
@@ -0,0 +1,142 @@
+"""Write a synthetic dataset with the same files and raw columns as dataset/.
+
+Usage (from assignment_1):
+    python benchmarks/synthetic_data.py --output /tmp/dataset --days 365 --campaigns 100
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DATA_FILES, COLUMN_MAPPINGS
+
+TACTIC_NAMES = ['ASC', 'Prospecting', 'Retargeting', 'Spark Ads', 'Display', 'Non-Branded Search', 'Branded Search']
+STATE_CODES = [
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY',
+    'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY', 'NC', 'ND',
+    'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'
+]
+
+# Raw CSV headers, i.e. the names before COLUMN_MAPPINGS renames them
+MARKETING_COLUMNS = ['date', 'tactic', 'state', 'campaign', 'impression', 'clicks', 'spend', 'attributed_revenue']
+BUSINESS_COLUMNS = ['date', 'no_of_orders', 'no_of_new_orders', 'new_customers', 'total_revenue', 'gross_profit', 'COGS']
+
+
+def _raw_names(kind, columns):
+    raw = {clean: original for original, clean in COLUMN_MAPPINGS[kind].items()}
+    return [raw.get(col, col) for col in columns]
+
+
+def _names(pool, count, fallback):
+    return pool[:count] + [fallback.format(i + 1) for i in range(len(pool), count)]
+
+
+def channel_names(count):
+    return _names(list(DATA_FILES['marketing']), count, 'Channel{:02d}')
+
+
+def _marketing_frame(channel, dates, campaigns, tactics, states, rng):
+    # One row per campaign and day; each campaign keeps one tactic and one state
+    campaign_tactic = np.arange(campaigns) % len(tactics)
+    campaign_state = rng.integers(0, len(states), campaigns)
+    width = max(2, len(str(campaigns)))
+    names = [f"{channel} - {tactics[t]} - C{j + 1:0{width}d}" for j, t in enumerate(campaign_tactic)]
+
+    n = len(dates) * campaigns
+    campaign_idx = np.tile(np.arange(campaigns), len(dates))
+    ctr = rng.uniform(0.01, 0.04) * rng.lognormal(0, 0.2, n)
+    cpc = rng.uniform(0.15, 0.75) * rng.lognormal(0, 0.2, n)
+    roas = rng.uniform(1.6, 3.3, campaigns)[campaign_idx] * rng.lognormal(0, 0.15, n)
+
+    impression = rng.lognormal(np.log(170000), 0.35, n).astype(np.int64)
+    clicks = (impression * ctr).astype(np.int64)
+    spend = (clicks * cpc).round(2)
+
+    return pd.DataFrame({
+        'date': np.repeat(dates.strftime('%Y-%m-%d').to_numpy(), campaigns),
+        'tactic': pd.Categorical.from_codes(campaign_tactic[campaign_idx], tactics),
+        'state': pd.Categorical.from_codes(campaign_state[campaign_idx], states),
+        'campaign': pd.Categorical.from_codes(campaign_idx, names),
+        'impression': impression,
+        'clicks': clicks,
+        'spend': spend,
+        'attributed_revenue': (spend * roas).round(2)
+    })
+
+
+def _business_frame(dates, attributed_revenue, rng):
+    # Business revenue follows the attributed revenue of all channels on the same day
+    n = len(dates)
+    total_revenue = (attributed_revenue * rng.uniform(1.5, 2.1, n)).round(2)
+    orders = np.maximum(1, total_revenue / rng.normal(90, 8, n)).astype(np.int64)
+    new_orders = (orders * rng.uniform(0.35, 0.5, n)).astype(np.int64)
+    cogs = (total_revenue * rng.uniform(0.4, 0.55, n)).round(2)
+
+    return pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d'),
+        'no_of_orders': orders,
+        'no_of_new_orders': new_orders,
+        'new_customers': (new_orders * rng.uniform(0.95, 1.05, n)).astype(np.int64),
+        'total_revenue': total_revenue,
+        'gross_profit': (total_revenue - cogs).round(2),
+        'COGS': cogs
+    })
+
+
+def generate_dataset(target_dir, days=120, channels=3, campaigns=10, tactics=2, states=2,
+                     start='2025-05-16', seed=0):
+    """Write business and channel CSVs to target_dir and return the channel -> filename map.
+
+    Channels, tactics and states take the dataset's own names first; further ones are numbered.
+    Each channel has `campaigns` rows per day, so the bundled dataset is days=120, campaigns=10.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=days, freq='D')
+    tactic_pool = _names(TACTIC_NAMES, max(tactics, len(TACTIC_NAMES)), 'Tactic {:02d}')
+    state_names = _names(STATE_CODES, states, 'S{:03d}')
+    os.makedirs(target_dir, exist_ok=True)
+
+    marketing_files = {}
+    attributed_revenue = np.zeros(days)
+    for i, channel in enumerate(channel_names(channels)):
+        # Each channel draws its own tactic subset so the channels do not look identical
+        offset = (i * tactics) % len(tactic_pool)
+        channel_tactics = (tactic_pool[offset:] + tactic_pool[:offset])[:tactics]
+        frame = _marketing_frame(channel, dates, campaigns, channel_tactics, state_names, rng)
+        attributed_revenue += frame['attributed_revenue'].to_numpy().reshape(days, campaigns).sum(axis=1)
+
+        marketing_files[channel] = DATA_FILES['marketing'].get(channel, f"{channel}.csv")
+        frame.columns = _raw_names('marketing', MARKETING_COLUMNS)
+        frame.to_csv(os.path.join(target_dir, marketing_files[channel]), index=False)
+
+    business = _business_frame(dates, attributed_revenue, rng)
+    business.columns = _raw_names('business', BUSINESS_COLUMNS)
+    business.to_csv(os.path.join(target_dir, DATA_FILES['business']), index=False)
+
+    return marketing_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', required=True, help='Directory to write the CSVs to')
+    parser.add_argument('--days', type=int, default=120)
+    parser.add_argument('--channels', type=int, default=3)
+    parser.add_argument('--campaigns', type=int, default=10, help='Campaigns per channel (rows per channel per day)')
+    parser.add_argument('--tactics', type=int, default=2)
+    parser.add_argument('--states', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    marketing_files = generate_dataset(
+        args.output, args.days, args.channels, args.campaigns, args.tactics, args.states, seed=args.seed
+    )
+    rows = args.days * args.campaigns * len(marketing_files)
+    print(f"wrote {DATA_FILES['business']} and {len(marketing_files)} channel files ({rows:,} marketing rows) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -50,6 +50,101 @@ COLUMN_MAPPINGS = {
     }
 }
 
+# Column types applied while parsing, keyed by the cleaned column names
+DATA_SCHEMA = {
+    'business': {
+        'date': 'datetime',
+        'no_of_orders': 'int32',
+        'no_of_new_orders': 'int32',
+        'new_customers': 'int32'
+    },
+    'marketing': {
+        'date': 'datetime',
+        'tactic': 'category',
+        'state': 'category',
+        'campaign': 'category',
+        'impression': 'int32',
+        'clicks': 'int32',
+        'spend': 'float32',
+        'attributed_revenue': 'float32'
+    }
+}
+
+DATE_FORMAT = '%Y-%m-%d'
+
+# Daily marketing cube: measures summed per date and dimension combination
+CUBE_DIMENSIONS = ['channel', 'tactic', 'campaign', 'state']
+CUBE_MEASURES = ['spend', 'clicks', 'impression', 'attributed_revenue']
+
+# Marketing ingestion: 'full' loads raw rows, 'streaming' folds CSV chunks straight into the cube.
+# Channel files are loaded concurrently with a 'thread' or 'process' executor (None for sequential).
+INGESTION_SETTINGS = {
+    'mode': 'full',
+    'chunk_size': 250000,
+    'merge_every': 8,
+    'executor': 'thread',
+    'max_workers': None
+}
+
+# Incremental refresh: appended CSV rows are parsed from the last ingested byte offset
+# and merged into the loaded data; sources are checked at most once per interval (seconds)
+REFRESH_SETTINGS = {
+    'enabled': True,
+    'interval': 60
+}
+
+# On-disk columnar cache for parsed source files (relative to this folder)
+CACHE_SETTINGS = {
+    'enabled': True,
+    'directory': '.cache',
+    'version': 3
+}
+
+# Query backend for the filtered metrics and channel/campaign/tactic tables: 'pandas' slices the
+# in-memory cube, 'duckdb' registers the channel files (CSV or Parquet) in an embedded DuckDB
+# database and runs the filters and group-bys there (needs the optional duckdb package).
+# With materialize the files are copied into a DuckDB table once; otherwise every query scans them.
+QUERY_SETTINGS = {
+    'backend': 'pandas',
+    'database': ':memory:',
+    'materialize': True,
+    'threads': None
+}
+
+# Campaign leaderboard: campaigns shown per list and minimum spend to be ranked
+CAMPAIGN_RANKING = {
+    'k': 10,
+    'min_spend': 0.0
+}
+
+# Debug panel: a sidebar toggle that records wall time, rows in/out and allocated bytes of the
+# instrumented pipeline functions for the next runs. Memory tracking uses tracemalloc, which is
+# process-wide and slows every session down while it is on.
+PROFILING_SETTINGS = {
+    'panel': True,
+    'track_memory': True,
+    'max_events': 5000
+}
+
+# Per-session memoization of filter results
+MEMO_SETTINGS = {
+    'maxsize': 32
+}
+
+# Dashboard views: with lazy_tabs only the view picked in the view selector is computed and
+# rendered; otherwise every view is built on each rerun inside st.tabs
+LAYOUT_SETTINGS = {
+    'lazy_tabs': True
+}
+
+# Chart rendering: line traces are downsampled to a point budget and switch to WebGL above a size threshold
+CHART_SETTINGS = {
+    'max_points': 2000,
+    'downsampling': 'lttb',
+    'webgl_threshold': 1000,
+    'figure_cache_size': 16
+}
+
 # Chart color schemes
 COLORS = {
     'revenue': '#2E8B57',
@@ -69,3 +164,20 @@ TIME_PERIODS = {
     'Last 90 Days': 90,
     'All Time': None
 }
+
+# Sidebar option that exposes a free date-range picker
+CUSTOM_TIME_PERIOD = 'Custom Range'
+
+# Media-mix model package from assignment_2, used by the Budget Optimizer tab.
+# Dashboard channels map onto the model's weekly spend columns.
+MMM_SETTINGS = {
+    'package_dir': '../assignment_2',
+    'channel_map': {
+        'Facebook': 'facebook_spend',
+        'Google': 'google_spend',
+        'TikTok': 'tiktok_spend'
+    },
+    'default_weekly_budget': 50000,
+    'bound_step': 5,
+    'marginal_spend_step': 10000
+}
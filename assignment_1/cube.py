@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from config import CUBE_DIMENSIONS, CUBE_MEASURES
+from instrumentation import instrument
+
+
+def concat_frames(frames):
+    # Categoricals only survive concat when every frame shares the same categories
+    category_columns = [col for col in frames[0].columns if isinstance(frames[0][col].dtype, pd.CategoricalDtype)]
+    for col in category_columns:
+        categories = pd.Index(np.concatenate([df[col].cat.categories for df in frames])).unique()
+        for df in frames:
+            df[col] = df[col].cat.set_categories(categories)
+    
+    return pd.concat(frames, ignore_index=True)
+
+
+def widen_measures(frame, columns=CUBE_MEASURES):
+    # Measures are stored as float32, but sums over many rows need float64 to keep cent precision
+    return frame.astype({col: np.float64 for col in columns if frame[col].dtype == np.float32}, copy=False)
+
+
+@instrument
+def build_marketing_cube(marketing_df):
+    cube = widen_measures(marketing_df).groupby(['date'] + CUBE_DIMENSIONS, observed=True)[CUBE_MEASURES].sum()
+    
+    # Keep only the date in the index so date filters are a sorted-index slice
+    return cube.reset_index(level=CUBE_DIMENSIONS)
+
+
+def merge_cubes(cubes):
+    return build_marketing_cube(concat_frames([cube.reset_index() for cube in cubes]))
+
+
+def append_to_cube(cube, new_cube):
+    # Only dates from the first new date onwards are regrouped; earlier rows are kept as they are
+    split = cube.index.searchsorted(new_cube.index.min(), 'left')
+    if split < len(cube):
+        new_cube = merge_cubes([cube.iloc[split:], new_cube])
+    
+    merged = concat_frames([cube.iloc[:split].reset_index(), new_cube.reset_index()])
+    return merged.set_index('date')
+
+
+def slice_cube(cube, date_filter=None, channel_filter=None, end_date=None):
+    if date_filter or end_date:
+        cube = cube.loc[date_filter:end_date]
+    
+    if channel_filter and channel_filter != 'All':
+        cube = cube[cube['channel'] == channel_filter]
+    
+    return cube
+
+
+def roll_up_daily(cube):
+    return widen_measures(cube).groupby(level='date')[CUBE_MEASURES].sum()
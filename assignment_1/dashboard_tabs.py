@@ -1,9 +1,25 @@
+import numpy as np
+import pandas as pd
 import streamlit as st
-from metrics import (
-    calculate_channel_performance, 
-    calculate_campaign_performance, 
-    calculate_tactic_performance,
-    format_metrics_for_display
+from config import CAMPAIGN_RANKING, MMM_SETTINGS
+from metrics import DISPLAY_NUMBER_FORMATS
+from instrumentation import instrument
+from mmm_bridge import (
+    MMM_IMPORT_ERROR,
+    SPEND_CHANNELS,
+    channel_label,
+    budget_channels,
+    held_channel_spend,
+    current_weekly_allocation,
+    run_budget_optimizer,
+    predict_allocation_revenue,
+    allocation_table,
+    get_response_curves,
+    marginal_returns_table,
+    response_curve_frame,
+    weekly_spend_history,
+    weekly_revenue_drivers,
+    driver_table
 )
 from visualizations import (
     create_performance_trends_chart,
@@ -12,31 +28,81 @@ from visualizations import (
     create_margin_trend_chart,
     create_cost_breakdown_chart,
     create_efficiency_scatter_chart,
-    create_tactic_performance_chart
+    create_tactic_performance_chart,
+    create_budget_allocation_chart,
+    create_response_curve_chart,
+    create_driver_decomposition_chart,
+    cached_figure
 )
 
 
-def render_performance_trends_tab(combined_df):    
+def build_column_config(columns_to_format, labels=None):
+    labels = labels or {}
+    column_config = dict(labels)
+    
+    for col, format_type in columns_to_format.items():
+        column_config[col] = st.column_config.NumberColumn(labels.get(col), **DISPLAY_NUMBER_FORMATS[format_type])
+    
+    return column_config
+
+
+@instrument
+def render_performance_trends_tab(combined_df, weekly_spend):    
     st.subheader("Business Performance Over Time")
     
-    fig = create_performance_trends_chart(combined_df)
-    st.plotly_chart(fig, use_container_width=True)
+    fig = cached_figure(create_performance_trends_chart, combined_df)
+    st.plotly_chart(fig, width="stretch")
+    
+    render_revenue_drivers(weekly_spend, combined_df)
 
 
-def render_channel_analysis_tab(filtered_marketing):    
-    st.subheader("Marketing Channel Performance")
+@instrument
+def render_revenue_drivers(weekly_spend, combined_df):
+    st.subheader("Modeled Revenue Drivers")
     
-    channel_performance = calculate_channel_performance(filtered_marketing)
+    if MMM_IMPORT_ERROR is not None:
+        st.info(f"The media-mix model package could not be imported: {MMM_IMPORT_ERROR}")
+        return
+    
+    weeks, spend = weekly_spend_history(weekly_spend())
+    # Weeks ending within the selected dates, or partly covered by them
+    week_ends = pd.DatetimeIndex(weeks)
+    in_window = (week_ends >= combined_df['date'].min()) & (week_ends - pd.Timedelta(days=6) <= combined_df['date'].max())
+    if not in_window.any():
+        st.info("No marketing spend in the selected period.")
+        return
+    
+    try:
+        # Attributed over the full history so a week's drivers do not change with the sidebar filters
+        attributions = weekly_revenue_drivers(weeks, spend)
+    except (ValueError, OSError) as e:
+        st.warning(f"Could not attribute revenue: {e}")
+        return
+    
+    week_label = st.selectbox("Week ending", week_ends[in_window][::-1].strftime('%Y-%m-%d'))
+    drivers = driver_table(attributions, pd.Timestamp(week_label))
+    
+    fig = cached_figure(create_driver_decomposition_chart, drivers, week_label)
+    st.plotly_chart(fig, width="stretch")
+    st.caption(
+        "SHAP contributions of each model feature to the predicted log revenue for the week's spend, "
+        "with non-spend drivers held at their baseline values. Spend covers every channel, whatever the channel filter."
+    )
+
+
+@instrument
+def render_channel_analysis_tab(channel_performance, combined_df, mix_performance):    
+    st.subheader("Marketing Channel Performance")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_roas = create_channel_roas_chart(channel_performance)
-        st.plotly_chart(fig_roas, use_container_width=True)
+        fig_roas = cached_figure(create_channel_roas_chart, channel_performance)
+        st.plotly_chart(fig_roas, width="stretch")
     
     with col2:
-        fig_spend = create_spend_allocation_chart(channel_performance)
-        st.plotly_chart(fig_spend, use_container_width=True)
+        fig_spend = cached_figure(create_spend_allocation_chart, channel_performance)
+        st.plotly_chart(fig_spend, width="stretch")
     
     st.subheader("Detailed Channel Metrics")
     
@@ -48,64 +114,186 @@ def render_channel_analysis_tab(filtered_marketing):
         'cpc': 'currency'
     }
     
-    display_df = format_metrics_for_display(channel_performance, format_config)
-    display_df.columns = ['Channel', 'Total Spend', 'Attributed Revenue', 'Clicks', 'Impressions', 'ROAS', 'CTR', 'CPC']
-    st.dataframe(display_df, use_container_width=True)
+    labels = dict(zip(
+        channel_performance.columns,
+        ['Channel', 'Total Spend', 'Attributed Revenue', 'Clicks', 'Impressions', 'ROAS', 'CTR', 'CPC']
+    ))
+    st.dataframe(
+        channel_performance,
+        column_config=build_column_config(format_config, labels),
+        width="stretch"
+    )
+    
+    render_marginal_returns(mix_performance(), combined_df)
+
+
+@instrument
+def render_marginal_returns(mix_performance, combined_df):
+    # Every channel's current spend in the date window, so the sidebar channel filter does not zero the others
+    st.subheader("Marginal Returns")
+    
+    if MMM_IMPORT_ERROR is not None:
+        st.info(f"The media-mix model package could not be imported: {MMM_IMPORT_ERROR}")
+        return
+    
+    try:
+        curves = get_response_curves()
+    except (ValueError, OSError) as e:
+        st.warning(f"Could not load the response curves: {e}")
+        return
+    
+    delta = st.number_input(
+        "Additional weekly spend ($)", min_value=100.0, value=float(MMM_SETTINGS['marginal_spend_step']), step=1000.0
+    )
+    
+    current = current_weekly_allocation(mix_performance, combined_df)
+    marginal = marginal_returns_table(curves, current, delta)
+    
+    fig = cached_figure(create_response_curve_chart, response_curve_frame(curves), marginal)
+    st.plotly_chart(fig, width="stretch")
+    
+    format_config = {
+        'weekly_spend': 'currency',
+        'predicted_revenue': 'currency',
+        'marginal_roas': 'multiplier',
+        'saturation_spend': 'currency'
+    }
+    labels = {
+        'channel': 'Channel',
+        'weekly_spend': 'Current Weekly Spend',
+        'predicted_revenue': 'Predicted Weekly Revenue',
+        'marginal_roas': f'Marginal ROAS (next ${delta:,.0f})',
+        'saturation_spend': 'Saturation Spend'
+    }
+    st.dataframe(
+        marginal,
+        column_config=build_column_config(format_config, labels),
+        width="stretch"
+    )
 
 
+@instrument
 def render_profitability_tab(combined_df, metrics):    
     st.subheader("Profitability Analysis")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_margin = create_margin_trend_chart(combined_df)
-        st.plotly_chart(fig_margin, use_container_width=True)
+        fig_margin = cached_figure(create_margin_trend_chart, combined_df)
+        st.plotly_chart(fig_margin, width="stretch")
     
     with col2:
-        fig_costs = create_cost_breakdown_chart(metrics, combined_df)
-        st.plotly_chart(fig_costs, use_container_width=True)
+        fig_costs = cached_figure(create_cost_breakdown_chart, metrics, combined_df)
+        st.plotly_chart(fig_costs, width="stretch")
     
     st.subheader("Marketing Efficiency Analysis")
     
-    fig_efficiency = create_efficiency_scatter_chart(combined_df)
-    st.plotly_chart(fig_efficiency, use_container_width=True)
+    fig_efficiency = cached_figure(create_efficiency_scatter_chart, combined_df)
+    st.plotly_chart(fig_efficiency, width="stretch")
 
 
-def render_campaign_details_tab(filtered_marketing):    
+@instrument
+def render_campaign_details_tab(top_campaigns, bottom_campaigns, tactic_performance):    
     st.subheader("Campaign Performance Details")
-    campaign_performance = calculate_campaign_performance(filtered_marketing)
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.write("**🏆 Top 10 Campaigns by ROAS**")
-        top_campaigns = campaign_performance.head(10).copy()
+        st.write(f"**🏆 Top {CAMPAIGN_RANKING['k']} Campaigns by ROAS**")
         
         format_config = {
             'spend': 'currency',
             'attributed_revenue': 'currency',
             'roas': 'multiplier'
         }
+        display_columns = ['channel', 'campaign', 'spend', 'attributed_revenue', 'roas']
         
-        top_campaigns_formatted = format_metrics_for_display(top_campaigns, format_config)
         st.dataframe(
-            top_campaigns_formatted[['channel', 'campaign', 'spend', 'attributed_revenue', 'roas']],
-            use_container_width=True
+            top_campaigns[display_columns],
+            column_config=build_column_config(format_config),
+            width="stretch"
         )
     
     with col2:
-        st.write("**📉 Bottom 10 Campaigns by ROAS**")
-        bottom_campaigns = campaign_performance.tail(10).copy()
+        st.write(f"**📉 Bottom {CAMPAIGN_RANKING['k']} Campaigns by ROAS**")
         
-        bottom_campaigns_formatted = format_metrics_for_display(bottom_campaigns, format_config)
         st.dataframe(
-            bottom_campaigns_formatted[['channel', 'campaign', 'spend', 'attributed_revenue', 'roas']],
-            use_container_width=True
+            bottom_campaigns[display_columns],
+            column_config=build_column_config(format_config),
+            width="stretch"
         )
     
     st.subheader("Performance by Ad Tactic")
     
-    tactic_performance = calculate_tactic_performance(filtered_marketing)
-    fig_tactics = create_tactic_performance_chart(tactic_performance)
-    st.plotly_chart(fig_tactics, use_container_width=True)
+    fig_tactics = cached_figure(create_tactic_performance_chart, tactic_performance)
+    st.plotly_chart(fig_tactics, width="stretch")
+
+
+@instrument
+def render_budget_optimizer_tab(mix_performance, combined_df):
+    # mix_performance covers every channel in the date window, whatever the sidebar channel filter
+    st.subheader("Budget Optimizer")
+    
+    if MMM_IMPORT_ERROR is not None:
+        st.info(f"The media-mix model package could not be imported: {MMM_IMPORT_ERROR}")
+        return
+    
+    st.caption("Weekly spend split that maximizes revenue predicted by the two-stage media-mix model.")
+    
+    current = current_weekly_allocation(mix_performance, combined_df)
+    in_budget = np.isin(SPEND_CHANNELS, budget_channels())
+    current_budget = current[in_budget].sum()
+    default_budget = float(round(current_budget, -2)) or float(MMM_SETTINGS['default_weekly_budget'])
+    total_budget = st.number_input("Total weekly budget ($)", min_value=100.0, value=default_budget, step=1000.0)
+    
+    bounds = []
+    with st.expander("Channel bounds (% of budget)"):
+        for channel in budget_channels():
+            low, high = st.slider(
+                channel_label(channel), 0, 100, (0, 100), step=MMM_SETTINGS['bound_step'], key=f"budget_bounds_{channel}"
+            )
+            bounds.append((channel, total_budget * low / 100, total_budget * high / 100))
+    
+    held = held_channel_spend()
+    if held:
+        st.caption(
+            f"{', '.join(channel_label(c) for c in held)} have no dashboard data and are held at "
+            f"${next(iter(held.values())):,.0f} a week outside the budget in both mixes."
+        )
+    
+    # Current mix scaled to the same total, so the comparison is about the split only
+    scaled_current = current.copy()
+    if current_budget > 0:
+        scaled_current[in_budget] *= total_budget / current_budget
+    
+    try:
+        result = run_budget_optimizer(total_budget, tuple(bounds), tuple(scaled_current))
+        current_revenue = predict_allocation_revenue(tuple(scaled_current))
+    except (ValueError, OSError) as e:
+        st.warning(f"Could not optimize the budget: {e}")
+        return
+    
+    recommended = [result['allocation'][channel] for channel in SPEND_CHANNELS]
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Predicted Weekly Revenue (current mix)", f"${current_revenue:,.0f}")
+    with col2:
+        st.metric(
+            "Predicted Weekly Revenue (recommended)",
+            f"${result['predicted_revenue']:,.0f}",
+            delta=f"${result['predicted_revenue'] - current_revenue:,.0f}"
+        )
+    with col3:
+        st.metric("Allocations Evaluated", f"{result['candidates']:,}", delta=f"{result['seconds']:.2f}s", delta_color="off")
+    
+    fig = cached_figure(create_budget_allocation_chart, allocation_table(scaled_current, recommended))
+    st.plotly_chart(fig, width="stretch")
+    
+    st.write("**Best Allocations Found**")
+    top = result['top_allocations'].rename(columns={c: channel_label(c) for c in SPEND_CHANNELS})
+    st.dataframe(
+        top,
+        column_config=build_column_config({col: 'currency' for col in top.columns}),
+        width="stretch"
+    )
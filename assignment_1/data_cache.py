@@ -0,0 +1,74 @@
+import glob
+import hashlib
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from config import CACHE_SETTINGS
+
+
+def source_signature(path):
+    stat = os.stat(path)
+    return {
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns
+    }
+
+
+def _digest(payload):
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def data_version(paths):
+    signatures = [source_signature(path) for path in paths if os.path.exists(path)]
+    return _digest([CACHE_SETTINGS['version'], signatures])
+
+
+def _cache_prefix(path, cache_dir, namespace):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-{_digest([namespace, os.path.abspath(path)])}")
+
+
+def cache_file_for(path, cache_dir, namespace='frame', signature=None):
+    key = _digest([CACHE_SETTINGS['version'], signature or source_signature(path)])
+    return f"{_cache_prefix(path, cache_dir, namespace)}-{key}.feather"
+
+
+def _write_cache(df, cache_file, path, cache_dir, namespace):
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Drop entries written for older versions of the same source file
+    for stale_file in glob.glob(f"{_cache_prefix(path, cache_dir, namespace)}-*.feather"):
+        if stale_file != cache_file:
+            os.remove(stale_file)
+
+    # Uncompressed Arrow IPC so later loads can memory-map the file
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_file = f"{cache_file}.tmp-{os.getpid()}"
+    feather.write_feather(table, tmp_file, compression='uncompressed')
+    os.replace(tmp_file, cache_file)
+
+
+def read_cached_frame(path, reader, cache_dir, namespace='frame', signature=None):
+    cache_file = cache_file_for(path, cache_dir, namespace, signature)
+
+    if os.path.exists(cache_file):
+        table = feather.read_table(cache_file, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    df = reader(path)
+    try:
+        _write_cache(df, cache_file, path, cache_dir, namespace)
+    except OSError:
+        # A read-only or full disk should never block loading the data itself
+        pass
+
+    return df
+
+
+def clear_cache(cache_dir):
+    for cache_file in glob.glob(os.path.join(cache_dir, '*.feather')):
+        os.remove(cache_file)
@@ -1,37 +1,215 @@
+import io
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import repeat
+import numpy as np
 import pandas as pd
 import streamlit as st
-from config import DATA_FILES, COLUMN_MAPPINGS
+from config import DATA_FILES, COLUMN_MAPPINGS, DATA_SCHEMA, DATE_FORMAT, CACHE_SETTINGS, INGESTION_SETTINGS
+from data_cache import read_cached_frame, data_version
+from instrumentation import instrument
+from cube import build_marketing_cube, concat_frames, merge_cubes
+from metrics import build_metric_index
+from shared_store import freeze
 
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then reported as None
+    resource = None
 
-@st.cache_data
-def load_data():
+
+def _schema_read_args(kind):
+    raw_names = {clean: raw for raw, clean in COLUMN_MAPPINGS[kind].items()}
+    schema = {raw_names.get(col, col): dtype for col, dtype in DATA_SCHEMA[kind].items()}
+    
+    # Integer columns are parsed as float so a blank cell reads as NaN instead of failing the file
+    return {
+        'dtype': {
+            col: 'float64' if dtype.startswith('int') else dtype
+            for col, dtype in schema.items() if dtype != 'datetime'
+        },
+        'parse_dates': [col for col, dtype in schema.items() if dtype == 'datetime'],
+        'date_format': DATE_FORMAT
+    }
+
+
+def downcast_counts(df, kind):
+    # A blank count means nothing was recorded, the same zero the daily merges fill in
+    counts = {col: dtype for col, dtype in DATA_SCHEMA[kind].items() if dtype.startswith('int') and col in df.columns}
+    return df.fillna({col: 0 for col in counts}).astype(counts, copy=False)
+
+
+def read_csv_with_schema(source, kind, **read_kwargs):
+    df = pd.read_csv(source, **_schema_read_args(kind), **read_kwargs)
+    return downcast_counts(df.rename(columns=COLUMN_MAPPINGS[kind]), kind)
+
+
+def _read_business_csv(path):
+    return read_csv_with_schema(path, 'business')
+
+
+def _read_marketing_csv(path):
+    return read_csv_with_schema(path, 'marketing')
+
+
+def channel_column(channel, length, channels):
+    codes = np.full(length, channels.index(channel), dtype=np.int8)
+    return pd.Categorical.from_codes(codes, categories=channels)
+
+
+def _stream_marketing_csv(path, channel, channels, chunk_size):
+    partial_cubes = []
+    for chunk in pd.read_csv(path, chunksize=chunk_size, **_schema_read_args('marketing')):
+        chunk = downcast_counts(chunk.rename(columns=COLUMN_MAPPINGS['marketing']), 'marketing')
+        chunk['channel'] = channel_column(channel, len(chunk), channels)
+        partial_cubes.append(build_marketing_cube(chunk))
+        
+        # Fold partial cubes together regularly so memory stays bounded by the cube size
+        if len(partial_cubes) >= INGESTION_SETTINGS['merge_every']:
+            partial_cubes = [merge_cubes(partial_cubes)]
+    
+    if not partial_cubes:
+        raise ValueError(f"No rows found in {path}")
+    
+    # The cube is cached on disk with the date as a regular column
+    return merge_cubes(partial_cubes).reset_index()
+
+
+class _FilePrefix(io.RawIOBase):
+    # Stops at a byte limit, so rows appended after the file was measured are left unread
+    def __init__(self, f, size):
+        self._file = f
+        self._remaining = size
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buffer):
+        n = self._file.readinto(memoryview(buffer)[:self._remaining])
+        self._remaining -= n
+        return n
+
+
+def _read_prefix(path, reader, size):
+    with open(path, 'rb') as f:
+        return reader(io.BufferedReader(_FilePrefix(f, size)))
+
+
+def _read_source(path, reader, cache_dir, namespace='frame', signature=None):
+    if signature is not None:
+        reader = partial(_read_prefix, reader=reader, size=signature['size'])
+    if cache_dir is None:
+        return reader(path)
+    return read_cached_frame(path, reader, cache_dir, namespace, signature)
+
+
+def _report_load_error(error, dataset_dir):
+    st.error(f"Error loading data from dataset folder: {str(error)}")
+    st.info(f"Looking for files in: {dataset_dir}")
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def get_dataset_dir():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, 'dataset')
+
+
+def get_cache_dir():
+    if not CACHE_SETTINGS['enabled']:
+        return None
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    dataset_dir = os.path.join(script_dir, 'dataset')
+    return os.path.join(script_dir, CACHE_SETTINGS['directory'])
+
+
+def get_source_paths(dataset_dir):
+    filenames = [DATA_FILES['business']] + list(DATA_FILES['marketing'].values())
+    return [os.path.join(dataset_dir, filename) for filename in filenames]
+
+
+def get_data_version():
+    return data_version(get_source_paths(get_dataset_dir()))
+
+
+def _marketing_files(dataset_dir, marketing_files=None):
+    return {
+        channel: os.path.join(dataset_dir, filename)
+        for channel, filename in (marketing_files or DATA_FILES['marketing']).items()
+    }
+
+
+def _load_marketing_file(channel, path, channels, cache_dir, signatures=None):
+    df = _read_source(path, _read_marketing_csv, cache_dir, signature=(signatures or {}).get(path))
+    df['channel'] = channel_column(channel, len(df), channels)
+    return df
+
+
+def _load_channel_cube(channel, path, channels, cache_dir, chunk_size, signatures=None):
+    reader = partial(_stream_marketing_csv, channel=channel, channels=channels, chunk_size=chunk_size)
+    return _read_source(path, reader, cache_dir, namespace=f"cube-{channel}", signature=(signatures or {}).get(path))
+
+
+def _try_load(load_file, channel, path):
+    try:
+        return load_file(channel, path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _load_per_file(load_file, file_paths):
+    jobs = []
+    for channel, file_path in file_paths.items():
+        if os.path.exists(file_path):
+            jobs.append((channel, file_path))
+        else:
+            st.warning(f"Marketing data file not found: {file_path}")
+    
+    executor = INGESTION_SETTINGS['executor']
+    if executor is None or len(jobs) < 2:
+        outcomes = [_try_load(load_file, channel, file_path) for channel, file_path in jobs]
+    else:
+        pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        with pool_class(max_workers=INGESTION_SETTINGS['max_workers']) as pool:
+            # map yields results in submission order, so the concat order never depends on timing
+            channels, paths = zip(*jobs)
+            outcomes = list(pool.map(_try_load, repeat(load_file), channels, paths))
+    
+    frames = []
+    for (channel, file_path), (frame, error) in zip(jobs, outcomes):
+        if error is None:
+            frames.append(frame)
+        else:
+            st.warning(f"Could not load marketing data file {file_path}: {error}")
     
+    return frames
+
+
+@instrument
+def read_business_data(dataset_dir, cache_dir=None, signatures=None):
+    business_file = os.path.join(dataset_dir, DATA_FILES['business'])
+    return _read_source(business_file, _read_business_csv, cache_dir, signature=(signatures or {}).get(business_file))
+
+
+@instrument
+def read_data(dataset_dir, cache_dir=None, marketing_files=None, signatures=None):
     try:
-        business_file = os.path.join(dataset_dir, DATA_FILES['business'])
-        business_df = pd.read_csv(business_file)
-        
-        business_df = business_df.rename(columns=COLUMN_MAPPINGS['business'])
-        
-        marketing_files = {
-            channel: os.path.join(dataset_dir, filename)
-            for channel, filename in DATA_FILES['marketing'].items()
-        }
+        business_df = read_business_data(dataset_dir, cache_dir, signatures)
         
-        marketing_dfs = []
-        for channel, file_path in marketing_files.items():
-            if os.path.exists(file_path):
-                df = pd.read_csv(file_path)
-                df = df.rename(columns=COLUMN_MAPPINGS['marketing'])
-                df['channel'] = channel
-                marketing_dfs.append(df)
-            else:
-                st.warning(f"Marketing data file not found: {file_path}")
+        file_paths = _marketing_files(dataset_dir, marketing_files)
+        load_file = partial(_load_marketing_file, channels=list(file_paths), cache_dir=cache_dir, signatures=signatures)
+        marketing_dfs = _load_per_file(load_file, file_paths)
         
         if marketing_dfs:
-            marketing_df = pd.concat(marketing_dfs, ignore_index=True)
+            marketing_df = concat_frames(marketing_dfs)
         else:
             st.error("No marketing data files found in dataset folder")
             return None, None
@@ -39,26 +217,103 @@ def load_data():
         return business_df, marketing_df
         
     except Exception as e:
-        st.error(f"Error loading data from dataset folder: {str(e)}")
-        st.info(f"Looking for files in: {dataset_dir}")
+        _report_load_error(e, dataset_dir)
         return None, None
 
 
+@instrument
+def read_marketing_cube_streaming(dataset_dir, chunk_size=None, cache_dir=None, marketing_files=None, signatures=None):
+    chunk_size = chunk_size or INGESTION_SETTINGS['chunk_size']
+    
+    try:
+        file_paths = _marketing_files(dataset_dir, marketing_files)
+        load_file = partial(
+            _load_channel_cube, channels=list(file_paths), cache_dir=cache_dir, chunk_size=chunk_size,
+            signatures=signatures
+        )
+        channel_cubes = _load_per_file(load_file, file_paths)
+        
+        if not channel_cubes:
+            st.error("No marketing data files found in dataset folder")
+            return None, None
+        
+        marketing_cube = build_marketing_cube(concat_frames(channel_cubes))
+        report = {
+            'chunk_size': chunk_size,
+            'cube_rows': len(marketing_cube),
+            'peak_rss_bytes': peak_rss_bytes()
+        }
+        return marketing_cube, report
+    
+    except Exception as e:
+        _report_load_error(e, dataset_dir)
+        return None, None
+
+
+def load_dataset(dataset_dir, cache_dir=None, signatures=None):
+    """Reads business data and builds the marketing cube and metric index; None if a source failed to load.
+
+    signatures maps source paths to the source_signature taken before loading; those files are
+    parsed only up to the recorded size.
+    """
+    if INGESTION_SETTINGS['mode'] == 'streaming':
+        try:
+            business_df = read_business_data(dataset_dir, cache_dir, signatures)
+        except Exception as e:
+            _report_load_error(e, dataset_dir)
+            return None
+        marketing_cube, _ = read_marketing_cube_streaming(dataset_dir, cache_dir=cache_dir, signatures=signatures)
+    else:
+        business_df, marketing_df = read_data(dataset_dir, cache_dir, signatures=signatures)
+        if business_df is None or marketing_df is None:
+            return None
+        # Raw rows are only needed to build the cube and are dropped with this frame
+        business_df, marketing_df = prepare_data(business_df, marketing_df)
+        marketing_cube = build_marketing_cube(marketing_df)
+    
+    if business_df is None or marketing_cube is None:
+        return None
+    
+    return business_df, marketing_cube, build_metric_index(business_df, marketing_cube)
+
+
+@st.cache_resource(max_entries=1)
+def load_shared_data(data_version):
+    # st.cache_data unpickles a fresh copy for every caller; this holds one read-only copy per data
+    # version for the whole process, and sessions read it through shared_view
+    data = load_dataset(get_dataset_dir(), get_cache_dir())
+    return None if data is None else freeze(data)
+
+
+@instrument
 def prepare_data(business_df, marketing_df):
-    business_df['date'] = pd.to_datetime(business_df['date'])
-    marketing_df['date'] = pd.to_datetime(marketing_df['date'])
+    # Dates are parsed at read time, so this only converts frames built elsewhere; inputs are not modified
+    prepared = []
+    for df in (business_df, marketing_df):
+        if not pd.api.types.is_datetime64_any_dtype(df['date']):
+            df = df.assign(date=pd.to_datetime(df['date']))
+        prepared.append(df)
     
-    return business_df, marketing_df
+    return tuple(prepared)
+
 
+def memory_footprint(df):
+    return int(df.memory_usage(deep=True).sum())
 
+
+@instrument
 def get_data_info(business_df, marketing_df):    
+    # Accepts raw marketing rows or the date-indexed marketing cube
+    marketing_dates = marketing_df['date'] if 'date' in marketing_df.columns else marketing_df.index
+    
     return {
         'business_records': len(business_df),
         'marketing_records': len(marketing_df),
         'date_range': {
-            'start': min(business_df['date'].min(), marketing_df['date'].min()),
-            'end': max(business_df['date'].max(), marketing_df['date'].max())
+            'start': min(business_df['date'].min(), marketing_dates.min()),
+            'end': max(business_df['date'].max(), marketing_dates.max())
         },
         'channels': sorted(marketing_df['channel'].unique().tolist()),
-        'tactics': marketing_df.groupby('channel')['tactic'].nunique().to_dict()
+        'tactics': marketing_df.groupby('channel', observed=True)['tactic'].nunique().to_dict(),
+        'memory_bytes': memory_footprint(business_df) + memory_footprint(marketing_df)
     }
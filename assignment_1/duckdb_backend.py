@@ -0,0 +1,181 @@
+import os
+import pandas as pd
+import streamlit as st
+from config import DATA_FILES, COLUMN_MAPPINGS, DATA_SCHEMA, DATE_FORMAT, CUBE_MEASURES, QUERY_SETTINGS
+from instrumentation import instrument
+from data_loader import get_dataset_dir
+from metrics import combine_daily, channel_ratios, campaign_ratios, tactic_ratios
+
+try:
+    import duckdb
+except ImportError:
+    # Optional dependency; the pandas backend in metrics.py works without it
+    duckdb = None
+
+SQL_TYPES = {
+    'datetime': 'DATE',
+    'category': 'VARCHAR',
+    'int32': 'INTEGER',
+    'float32': 'FLOAT'
+}
+
+# BIGINT instead of DuckDB's HUGEINT for integer sums; float sums are DOUBLE, like the float64 sums in cube.py
+SUM_TYPES = {'int32': 'BIGINT', 'float32': 'DOUBLE'}
+
+# Column order of the pandas performance tables
+PERFORMANCE_MEASURES = ['spend', 'attributed_revenue', 'clicks', 'impression']
+
+
+def _quote(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _scan(path):
+    # Channel files keep the raw CSV headers whether they are CSV or Parquet
+    if path.lower().endswith('.parquet'):
+        return f"read_parquet({_quote(path)})"
+
+    raw_names = {clean: raw for raw, clean in COLUMN_MAPPINGS['marketing'].items()}
+    types = ', '.join(
+        f"{_quote(raw_names.get(col, col))}: {_quote(SQL_TYPES[dtype])}"
+        for col, dtype in DATA_SCHEMA['marketing'].items()
+    )
+    return f"read_csv({_quote(path)}, header = true, dateformat = {_quote(DATE_FORMAT)}, types = {{{types}}})"
+
+
+def _channel_select(channel, index, path):
+    raw_names = {clean: raw for raw, clean in COLUMN_MAPPINGS['marketing'].items()}
+    columns = [
+        f'CAST("{raw_names.get(col, col)}" AS {SQL_TYPES[dtype]}) AS {col}'
+        if not dtype.startswith('int') else
+        # Blank counts are zero, as in data_loader.downcast_counts
+        f'COALESCE(CAST("{raw_names.get(col, col)}" AS {SQL_TYPES[dtype]}), 0) AS {col}'
+        for col, dtype in DATA_SCHEMA['marketing'].items()
+    ]
+    columns += [f"{_quote(channel)} AS channel", f"CAST({index} AS SMALLINT) AS channel_idx"]
+    return f"SELECT {', '.join(columns)} FROM {_scan(path)}"
+
+
+def connect_marketing(dataset_dir, marketing_files=None, database=None, materialize=None, threads=None):
+    """Registers the channel files as one `marketing` relation and returns the store the queries run on."""
+    if duckdb is None:
+        raise ImportError("The duckdb query backend needs the duckdb package (pip install duckdb)")
+    database = database or QUERY_SETTINGS['database']
+    materialize = QUERY_SETTINGS['materialize'] if materialize is None else materialize
+    threads = threads or QUERY_SETTINGS['threads']
+
+    file_paths = {
+        channel: os.path.join(dataset_dir, filename)
+        for channel, filename in (marketing_files or DATA_FILES['marketing']).items()
+    }
+    channels = list(file_paths)
+    selects = []
+    for channel, path in file_paths.items():
+        if os.path.exists(path):
+            selects.append(_channel_select(channel, channels.index(channel), path))
+        else:
+            st.warning(f"Marketing data file not found: {path}")
+    if not selects:
+        raise FileNotFoundError(f"No marketing data files found in {dataset_dir}")
+
+    con = duckdb.connect(database)
+    if threads:
+        con.execute(f"SET threads = {int(threads)}")
+
+    union = ' UNION ALL '.join(selects)
+    if materialize:
+        # Rows sorted by date keep each row group's date range narrow, so date filters skip most of them
+        con.execute(f"CREATE OR REPLACE TABLE marketing AS {union} ORDER BY date, channel_idx")
+    else:
+        con.execute(f"CREATE OR REPLACE VIEW marketing AS {union}")
+
+    return {'connection': con, 'channels': channels}
+
+
+@st.cache_resource(max_entries=1)
+def get_marketing_store(data_version):
+    # One store per data version; an appended source file builds a new one and drops the old
+    return connect_marketing(get_dataset_dir())
+
+
+def _where(channels, date_filter=None, channel_filter=None, end_date=None):
+    conditions, params = [], []
+    if date_filter:
+        conditions.append('date >= ?')
+        params.append(pd.Timestamp(date_filter).date())
+    if end_date:
+        conditions.append('date <= ?')
+        params.append(pd.Timestamp(end_date).date())
+    if channel_filter and channel_filter != 'All':
+        # The integer ordinal compares faster than the channel name
+        conditions.append('channel_idx = ?')
+        params.append(channels.index(channel_filter) if channel_filter in channels else -1)
+    return ('WHERE ' + ' AND '.join(conditions)) if conditions else '', params
+
+
+def _measures(measures):
+    return ', '.join(
+        f"CAST(SUM({col}) AS {SUM_TYPES[DATA_SCHEMA['marketing'][col]]}) AS {col}" for col in measures
+    )
+
+
+def _query(marketing_query, keys, measures):
+    # A cursor per query: the store is shared across sessions and DuckDB connections are not thread-safe
+    order = ', '.join(str(i + 1) for i in range(len(keys)))
+    sql = (
+        f"SELECT {', '.join(keys)}, {_measures(measures)} FROM marketing {marketing_query['where']} "
+        f"GROUP BY ALL ORDER BY {order}"
+    )
+    cursor = marketing_query['connection'].cursor()
+    try:
+        return cursor.execute(sql, marketing_query['params']).df()
+    finally:
+        cursor.close()
+
+
+def _channel_codes(marketing_query, frame):
+    return pd.Categorical.from_codes(frame.pop('channel_idx').to_numpy(), categories=marketing_query['channels'])
+
+
+def _by_channel(marketing_query, dimension=None):
+    keys = ['channel_idx'] + ([dimension] if dimension else [])
+    frame = _query(marketing_query, keys, PERFORMANCE_MEASURES)
+    frame.insert(0, 'channel', _channel_codes(marketing_query, frame))
+    return frame
+
+
+@instrument
+def calculate_metrics(business_df, marketing_store, date_filter=None, channel_filter=None, end_date=None):
+    """Same frame as metrics.calculate_metrics; the second value is a filtered query instead of a cube slice."""
+    where, params = _where(marketing_store['channels'], date_filter, channel_filter, end_date)
+    marketing_query = dict(marketing_store, where=where, params=params)
+
+    marketing_daily = _query(marketing_query, ['date'], CUBE_MEASURES)
+    marketing_daily['date'] = marketing_daily['date'].astype(business_df['date'].dtype)
+
+    return combine_daily(business_df, marketing_daily, date_filter, end_date), marketing_query
+
+
+@instrument
+def calculate_channel_performance(marketing_query):
+    return channel_ratios(_by_channel(marketing_query))
+
+
+@instrument
+def calculate_campaign_performance(marketing_query):
+    return campaign_ratios(_by_channel(marketing_query, 'campaign'))
+
+
+@instrument
+def calculate_tactic_performance(marketing_query):
+    return tactic_ratios(_by_channel(marketing_query, 'tactic'))
+
+
+@instrument
+def calculate_weekly_channel_spend(marketing_query):
+    # Same Sunday week ends as pd.Grouper(freq='W')
+    week = "CAST(date_trunc('week', date) + INTERVAL 6 DAY AS DATE) AS date"
+    frame = _query(marketing_query, [week, 'channel_idx'], ['spend'])
+    frame['date'] = frame['date'].astype('datetime64[ns]')
+    frame['channel'] = _channel_codes(marketing_query, frame)
+    return frame.pivot(index='date', columns='channel', values='spend').fillna(0)
@@ -0,0 +1,187 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import pandas as pd
+import streamlit as st
+from config import DATA_FILES, REFRESH_SETTINGS
+from instrumentation import instrument
+from cube import build_marketing_cube, append_to_cube, concat_frames
+from data_cache import source_signature
+from data_loader import get_dataset_dir, get_cache_dir, read_csv_with_schema, channel_column, load_dataset
+from metrics import build_metric_index, extend_metric_index
+from shared_store import freeze, shared_view
+
+# Bytes before the ingested offset that must stay unchanged for an append to be trusted
+FINGERPRINT_BYTES = 4096
+
+
+def _fingerprint(path, offset):
+    start = max(0, offset - FINGERPRINT_BYTES)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+
+def _read_header(path):
+    with open(path, 'rb') as f:
+        return pd.read_csv(io.BytesIO(f.readline()), nrows=0).columns.tolist()
+
+
+def _tracked_sources(dataset_dir):
+    sources = {os.path.join(dataset_dir, DATA_FILES['business']): {'kind': 'business', 'channel': None}}
+    for channel, filename in DATA_FILES['marketing'].items():
+        sources[os.path.join(dataset_dir, filename)] = {'kind': 'marketing', 'channel': channel}
+    return sources
+
+
+def _source_state(path, source, signature):
+    # Taken before the loaders parse the file, which they read only up to this offset
+    offset = signature['size']
+    return dict(
+        source,
+        offset=offset,
+        mtime_ns=signature['mtime_ns'],
+        fingerprint=_fingerprint(path, offset),
+        header=_read_header(path)
+    )
+
+
+def _data_version(sources):
+    offsets = sorted((path, state['offset'], state['mtime_ns']) for path, state in sources.items())
+    return hashlib.sha1(json.dumps(offsets).encode('utf-8')).hexdigest()[:16]
+
+
+def _read_appended_rows(path, state):
+    with open(path, 'rb') as f:
+        f.seek(state['offset'])
+        data = f.read()
+
+    # A partially written last line is left for the next refresh
+    complete = data.rfind(b'\n') + 1
+    if complete == 0 or not data[:complete].strip():
+        return None, state
+
+    frame = read_csv_with_schema(io.BytesIO(data[:complete]), state['kind'], header=None, names=state['header'])
+    if state['kind'] == 'marketing':
+        frame['channel'] = channel_column(state['channel'], len(frame), list(DATA_FILES['marketing']))
+
+    offset = state['offset'] + complete
+    new_state = dict(
+        state,
+        offset=offset,
+        fingerprint=_fingerprint(path, offset),
+        last_date=max(state['last_date'], frame['date'].max())
+    )
+    return frame, new_state
+
+
+@st.cache_resource
+def get_incremental_store():
+    # The store is shared by every session: its data is frozen and sessions read it through shared_view
+    # Files are measured first, so rows appended while they are parsed stay past the offsets
+    dataset_dir = get_dataset_dir()
+    tracked = {path: source for path, source in _tracked_sources(dataset_dir).items() if os.path.exists(path)}
+    signatures = {path: source_signature(path) for path in tracked}
+    sources = {path: _source_state(path, source, signatures[path]) for path, source in tracked.items()}
+
+    data = load_dataset(dataset_dir, get_cache_dir(), signatures)
+    if data is None:
+        return None
+    business_df, marketing_cube, metric_index = freeze(data)
+
+    for state in sources.values():
+        if state['kind'] == 'business':
+            state['last_date'] = business_df['date'].max()
+        else:
+            state['last_date'] = marketing_cube.index[marketing_cube['channel'] == state['channel']].max()
+
+    return {
+        'data': (business_df, marketing_cube, metric_index),
+        'sources': sources,
+        'version': _data_version(sources),
+        'checked_at': time.monotonic(),
+        'lock': threading.Lock()
+    }
+
+
+def _merge_appended_rows(data, business_tail, marketing_tail):
+    business_df, marketing_cube, metric_index = data
+    last_indexed = pd.Timestamp(metric_index['dates'][-1]) if len(metric_index['dates']) else pd.Timestamp.min
+
+    if marketing_tail is not None:
+        marketing_cube = append_to_cube(marketing_cube, build_marketing_cube(marketing_tail))
+    if business_tail is not None:
+        business_tail = business_tail.sort_values('date')
+        business_df = pd.concat([business_df, business_tail], ignore_index=True)
+
+    # New days extend the prefix sums; rows for already indexed days change them, so rebuild
+    rewrites_history = (
+        (business_tail is not None and business_tail['date'].min() <= last_indexed)
+        or (marketing_tail is not None and marketing_tail['date'].min() <= last_indexed)
+    )
+    if rewrites_history:
+        metric_index = build_metric_index(business_df, marketing_cube)
+    elif business_tail is not None:
+        new_days = marketing_cube.loc[business_tail['date'].min():]
+        metric_index = extend_metric_index(metric_index, business_tail, new_days)
+
+    return business_df, marketing_cube, metric_index
+
+
+def refresh_store(store):
+    with store['lock']:
+        now = time.monotonic()
+        if now - store['checked_at'] < REFRESH_SETTINGS['interval']:
+            return True
+        store['checked_at'] = now
+
+        sources = dict(store['sources'])
+        business_tails, marketing_tails = [], []
+        for path, state in store['sources'].items():
+            stat = os.stat(path) if os.path.exists(path) else None
+            size, mtime_ns = (stat.st_size, stat.st_mtime_ns) if stat else (-1, -1)
+            if size == state['offset'] and mtime_ns == state['mtime_ns']:
+                continue
+
+            # Truncated or rewritten files cannot be refreshed incrementally; appends always grow
+            # the file, so a new mtime at the same size means it was rewritten in place
+            if size <= state['offset'] or _fingerprint(path, state['offset']) != state['fingerprint']:
+                return False
+
+            frame, new_state = _read_appended_rows(path, state)
+            sources[path] = dict(new_state, mtime_ns=mtime_ns)
+            if frame is not None:
+                (business_tails if state['kind'] == 'business' else marketing_tails).append(frame)
+
+        if not business_tails and not marketing_tails:
+            store['sources'] = sources
+            return True
+
+        business_tail = pd.concat(business_tails, ignore_index=True) if business_tails else None
+        marketing_tail = concat_frames(marketing_tails) if marketing_tails else None
+
+        # Merging builds new frames; sessions still holding the previous version keep reading it unchanged
+        store['data'] = freeze(_merge_appended_rows(store['data'], business_tail, marketing_tail))
+        store['sources'] = sources
+        store['version'] = _data_version(sources)
+        return True
+
+
+@instrument
+def load_incremental_data():
+    store = get_incremental_store()
+
+    if store is not None and not refresh_store(store):
+        get_incremental_store.clear()
+        store = get_incremental_store()
+
+    if store is None:
+        # Do not keep a failed load cached; the next rerun retries
+        get_incremental_store.clear()
+        return None, None, None, None
+
+    business_df, marketing_cube, metric_index = shared_view(store['data'])
+    return business_df, marketing_cube, metric_index, store['version']
@@ -1,10 +1,11 @@
 import streamlit as st
-from metrics import calculate_channel_performance
+from instrumentation import instrument
+from cube import widen_measures
 
 
-def generate_insights(combined_df, filtered_marketing, metrics):
-    channel_performance = calculate_channel_performance(filtered_marketing)
-    
+@instrument
+def generate_insights(channel_performance, metrics):
+    # channel_performance is the frame the Channel Analysis view shows, computed once per rerun
     if len(channel_performance) == 0:
         return None, None
     
@@ -34,11 +35,10 @@ def generate_insights(combined_df, filtered_marketing, metrics):
     return opportunities, improvements
 
 
-def render_insights_section(combined_df, filtered_marketing, metrics):
+@instrument
+def render_insights_section(opportunities, improvements):
     st.header("💡 Key Insights & Recommendations")
     
-    opportunities, improvements = generate_insights(combined_df, filtered_marketing, metrics)
-    
     if opportunities is None or improvements is None:
         st.warning("Not enough data to generate insights.")
         return
@@ -68,6 +68,7 @@ def render_insights_section(combined_df, filtered_marketing, metrics):
         """)
 
 
+@instrument
 def calculate_advanced_insights(combined_df, marketing_df):
     insights = {}
     
@@ -85,7 +86,7 @@ def calculate_advanced_insights(combined_df, marketing_df):
     else:
         insights['roas_trend'] = 0
     
-    channel_spend = marketing_df.groupby('channel')['spend'].sum()
+    channel_spend = widen_measures(marketing_df, ['spend']).groupby('channel', observed=True)['spend'].sum()
     total_spend = channel_spend.sum()
     insights['channel_concentration'] = (channel_spend / total_spend).max() if total_spend > 0 else 0
     
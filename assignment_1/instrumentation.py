@@ -0,0 +1,155 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+import pandas as pd
+from config import PROFILING_SETTINGS
+
+# Streamlit runs each session's script on its own thread, so every run records into its own list
+_run = threading.local()
+
+
+def _row_count(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, tuple):
+        counts = [_row_count(v) for v in value]
+        counts = [c for c in counts if c is not None]
+        return sum(counts) if counts else None
+    return None
+
+
+def _rows_in(args, kwargs):
+    counts = [_row_count(v) for v in list(args) + list(kwargs.values())]
+    counts = [c for c in counts if c is not None]
+    return sum(counts) if counts else None
+
+
+def start_run(track_memory=None):
+    track_memory = PROFILING_SETTINGS['track_memory'] if track_memory is None else track_memory
+    _run.events = []
+    _run.stack = []
+    _run.origin = time.perf_counter()
+    # tracemalloc is process-wide; other sessions running at the same time add to the counts
+    _run.owns_tracing = track_memory and not tracemalloc.is_tracing()
+    if _run.owns_tracing:
+        tracemalloc.start()
+    _run.track_memory = track_memory
+
+
+def finish_run():
+    events = getattr(_run, 'events', None)
+    if events is None:
+        return []
+    if _run.owns_tracing:
+        tracemalloc.stop()
+    _run.events = None
+    return events
+
+
+def is_recording():
+    return getattr(_run, 'events', None) is not None
+
+
+@contextmanager
+def span(name, rows_in=None):
+    """Records one timed section; set `rows_out` on the yielded dict to report output rows."""
+    if not is_recording():
+        yield {}
+        return
+
+    record = {'name': name, 'rows_in': rows_in, 'rows_out': None, 'depth': len(_run.stack), 'base': 0, 'peak': 0}
+    memory = _run.track_memory and tracemalloc.is_tracing()
+    if memory:
+        current, peak = tracemalloc.get_traced_memory()
+        # The parent keeps the highest peak seen so far before the counter is reset for this span
+        if _run.stack:
+            _run.stack[-1]['peak'] = max(_run.stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        record['base'], record['peak'] = current, current
+
+    _run.stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        end = time.perf_counter()
+        _run.stack.pop()
+
+        allocated = peak_bytes = None
+        if memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            record['peak'] = max(record['peak'], peak)
+            allocated = current - record['base']
+            peak_bytes = record['peak'] - record['base']
+            if _run.stack:
+                _run.stack[-1]['peak'] = max(_run.stack[-1]['peak'], record['peak'])
+
+        if len(_run.events) < PROFILING_SETTINGS['max_events']:
+            _run.events.append({
+                'name': name,
+                'start': start - _run.origin,
+                'duration': end - start,
+                'depth': record['depth'],
+                'rows_in': record['rows_in'],
+                'rows_out': record['rows_out'],
+                'allocated_bytes': allocated,
+                'peak_bytes': peak_bytes,
+                'thread': threading.get_ident()
+            })
+
+
+def instrument(fn):
+    """Records wall time, rows in/out and allocated bytes of each call while a run is recording."""
+    # Streamlit runs the app script as __main__; name its stages after the file instead
+    module = fn.__module__
+    if module == '__main__':
+        module = os.path.splitext(os.path.basename(fn.__code__.co_filename))[0]
+    name = f"{module}.{fn.__name__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not is_recording():
+            return fn(*args, **kwargs)
+
+        with span(name, _rows_in(args, kwargs)) as record:
+            result = fn(*args, **kwargs)
+            record['rows_out'] = _row_count(result)
+            return result
+
+    return wrapper
+
+
+def events_frame(events):
+    frame = pd.DataFrame(events, columns=[
+        'name', 'start', 'duration', 'depth', 'rows_in', 'rows_out', 'allocated_bytes', 'peak_bytes'
+    ])
+    frame = frame.sort_values('start', kind='stable')
+    # Nested calls are indented under the call that made them
+    frame['stage'] = ['· ' * depth + name for depth, name in zip(frame['depth'], frame['name'])]
+    frame['duration_ms'] = frame['duration'] * 1000
+    return frame
+
+
+def chrome_trace(events):
+    """Events as Chrome trace JSON (chrome://tracing, Perfetto); times are in microseconds."""
+    trace_events = []
+    for event in events:
+        trace_events.append({
+            'name': event['name'],
+            'cat': event['name'].split('.')[0],
+            'ph': 'X',
+            'ts': event['start'] * 1e6,
+            'dur': event['duration'] * 1e6,
+            'pid': os.getpid(),
+            'tid': event['thread'],
+            'args': {
+                key: event[key]
+                for key in ('rows_in', 'rows_out', 'allocated_bytes', 'peak_bytes')
+                if event[key] is not None
+            }
+        })
+    return json.dumps({'traceEvents': trace_events, 'displayTimeUnit': 'ms'})
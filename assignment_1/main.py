@@ -1,18 +1,35 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
+from functools import partial
 import warnings
 
-from config import PAGE_CONFIG, CUSTOM_CSS, TIME_PERIODS
-from data_loader import load_data, prepare_data, get_data_info
-from metrics import calculate_metrics, create_executive_metrics
+from config import (
+    PAGE_CONFIG,
+    CUSTOM_CSS,
+    TIME_PERIODS,
+    CUSTOM_TIME_PERIOD,
+    REFRESH_SETTINGS,
+    PROFILING_SETTINGS,
+    LAYOUT_SETTINGS,
+    QUERY_SETTINGS
+)
+from data_loader import load_shared_data, get_data_info, get_data_version
+import metrics as pandas_backend
+import duckdb_backend
+from metrics import create_executive_metrics, rank_campaigns
+from incremental import load_incremental_data
+from shared_store import shared_view
+from memo import get_session_cache, filter_key
+from instrumentation import instrument, start_run, finish_run, events_frame, chrome_trace
 from dashboard_tabs import (
     render_performance_trends_tab,
     render_channel_analysis_tab,
     render_profitability_tab,
-    render_campaign_details_tab
+    render_campaign_details_tab,
+    render_budget_optimizer_tab
 )
-from insights import render_insights_section
+from insights import generate_insights, render_insights_section
 
 warnings.filterwarnings('ignore')
 
@@ -26,7 +43,8 @@ def render_header():
     st.title("📊 E-commerce Marketing Analytics Dashboard")
     st.markdown("*Strategic insights for data-driven decision making*")
 
-def create_sidebar_filters(business_df, marketing_df):
+@instrument
+def create_sidebar_filters(business_df, marketing_cube):
     st.sidebar.header("📊 Dashboard Filters")
     st.sidebar.subheader("📅 Filters")
     
@@ -35,17 +53,30 @@ def create_sidebar_filters(business_df, marketing_df):
         if days is None:
             date_options[period_name] = business_df['date'].min()
         else:
-            date_options[period_name] = datetime.now() - timedelta(days=days)
+            date_options[period_name] = pd.Timestamp(datetime.now() - timedelta(days=days)).ceil('D')
+    
+    selected_period = st.sidebar.selectbox("Time Period", list(date_options.keys()) + [CUSTOM_TIME_PERIOD], index=2)
+    end_date = None
     
-    selected_period = st.sidebar.selectbox("Time Period", list(date_options.keys()), index=2)
-    date_filter = date_options[selected_period]
+    if selected_period == CUSTOM_TIME_PERIOD:
+        first_date = business_df['date'].min().date()
+        last_date = business_df['date'].max().date()
+        date_range = st.sidebar.date_input(
+            "Date Range", value=(first_date, last_date), min_value=first_date, max_value=last_date
+        )
+        date_filter = pd.Timestamp(date_range[0])
+        if len(date_range) == 2:
+            end_date = pd.Timestamp(date_range[1])
+    else:
+        date_filter = date_options[selected_period]
     
-    channels = ['All'] + sorted(marketing_df['channel'].unique().tolist())
+    channels = ['All'] + sorted(marketing_cube['channel'].unique().tolist())
     selected_channel = st.sidebar.selectbox("Marketing Channel", channels)
     
-    return date_filter, selected_channel
+    return date_filter, end_date, selected_channel
 
 
+@instrument
 def render_executive_summary(metrics):
     st.header("🎯 Executive Summary")
     
@@ -80,25 +111,123 @@ def render_executive_summary(metrics):
         )
 
 
-def render_dashboard_tabs(combined_df, filtered_marketing, metrics):
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "📈 Performance Trends", 
-        "🎯 Channel Analysis", 
-        "💰 Profitability", 
-        "🔍 Campaign Details"
-    ])
+DASHBOARD_VIEWS = [
+    "📈 Performance Trends", 
+    "🎯 Channel Analysis", 
+    "💰 Profitability", 
+    "🔍 Campaign Details",
+    "🧮 Budget Optimizer"
+]
+
+
+def select_query_backend(marketing_cube, data_version):
+    # The module that computes the filtered frames, and the marketing data it queries
+    if QUERY_SETTINGS['backend'] == 'duckdb':
+        if duckdb_backend.duckdb is not None:
+            return duckdb_backend, duckdb_backend.get_marketing_store(data_version)
+        st.warning("The duckdb query backend needs the duckdb package; using the pandas backend instead.")
+    return pandas_backend, marketing_cube
+
+
+def compute_campaign_details(cache, key, backend, filtered_marketing):
+    campaign_performance = cache.get_or_compute(('campaign',) + key, backend.calculate_campaign_performance, filtered_marketing)
+    top_campaigns, bottom_campaigns = cache.get_or_compute(('campaign_ranking',) + key, rank_campaigns, campaign_performance)
+    tactic_performance = cache.get_or_compute(('tactic',) + key, backend.calculate_tactic_performance, filtered_marketing)
+    return top_campaigns, bottom_campaigns, tactic_performance
+
+
+def compute_weekly_spend_history(cache, data_version, backend, business_df, marketing_source):
+    # Attributions carry adstock across weeks, so they are built from the full, unfiltered history
+    key = filter_key(data_version)
+    _, marketing = cache.get_or_compute(
+        ('metrics',) + key, backend.calculate_metrics, business_df, marketing_source, None, 'All', None
+    )
+    return cache.get_or_compute(('weekly_spend',) + key, backend.calculate_weekly_channel_spend, marketing)
+
+
+def compute_mix_performance(cache, data_version, backend, business_df, marketing_source, date_filter, end_date):
+    # The media-mix views model every channel, so they use the date window without the channel filter
+    key = filter_key(data_version, date_filter, end_date, 'All')
+    _, filtered_marketing = cache.get_or_compute(
+        ('metrics',) + key, backend.calculate_metrics, business_df, marketing_source, date_filter, 'All', end_date
+    )
+    return cache.get_or_compute(('channel',) + key, backend.calculate_channel_performance, filtered_marketing)
+
+
+@instrument
+def render_dashboard_tabs(combined_df, weekly_spend, metrics, channel_performance, campaign_details, mix_performance):
+    # weekly_spend, campaign_details and mix_performance are called only when their views render
+    renderers = [
+        lambda: render_performance_trends_tab(combined_df, weekly_spend),
+        lambda: render_channel_analysis_tab(channel_performance, combined_df, mix_performance),
+        lambda: render_profitability_tab(combined_df, metrics),
+        lambda: render_campaign_details_tab(*campaign_details()),
+        lambda: render_budget_optimizer_tab(mix_performance(), combined_df)
+    ]
     
-    with tab1:
-        render_performance_trends_tab(combined_df)
+    if LAYOUT_SETTINGS['lazy_tabs']:
+        # st.tabs runs every tab body on each rerun; the selector runs only the visible one
+        view = st.radio("View", DASHBOARD_VIEWS, horizontal=True, label_visibility='collapsed', key='active_view')
+        renderers[DASHBOARD_VIEWS.index(view)]()
+        return
     
-    with tab2:
-        render_channel_analysis_tab(filtered_marketing)
+    for tab, render in zip(st.tabs(DASHBOARD_VIEWS), renderers):
+        with tab:
+            render()
+
+
+@instrument
+def load_dashboard_data():
+    if REFRESH_SETTINGS['enabled']:
+        return load_incremental_data()
     
-    with tab3:
-        render_profitability_tab(combined_df, metrics)
+    data_version = get_data_version()
+    data = load_shared_data(data_version)
+    if data is None:
+        # Do not keep a failed load cached; the next rerun retries
+        load_shared_data.clear()
+        return None, None, None, None
     
-    with tab4:
-        render_campaign_details_tab(filtered_marketing)
+    business_df, marketing_cube, metric_index = shared_view(data)
+    return business_df, marketing_cube, metric_index, data_version
+
+
+def render_debug_panel(events, memo_stats):
+    st.sidebar.checkbox(
+        "🛠️ Performance panel", key='debug_panel',
+        help="Records time, rows and allocated memory of each pipeline stage on the following runs"
+    )
+    if not st.session_state.get('debug_panel'):
+        return
+    
+    lookups = memo_stats['hits'] + memo_stats['misses']
+    hit_rate = memo_stats['hits'] / lookups if lookups else 0
+    st.sidebar.caption(
+        f"Filter memo: {memo_stats['hits']} hits, {memo_stats['misses']} misses ({hit_rate:.0%}), "
+        f"{memo_stats['size']}/{memo_stats['maxsize']} entries"
+    )
+    if not events:
+        return
+    
+    frame = events_frame(events)
+    total_ms = frame.loc[frame['depth'] == 0, 'duration_ms'].sum()
+    with st.sidebar.expander(f"Stage timings ({total_ms:,.0f} ms)", expanded=True):
+        st.dataframe(
+            frame[['stage', 'duration_ms', 'rows_in', 'rows_out', 'allocated_bytes', 'peak_bytes']],
+            column_config={
+                'stage': 'Stage',
+                'duration_ms': st.column_config.NumberColumn('ms', format='%.1f'),
+                'rows_in': st.column_config.NumberColumn('Rows in', format='%d'),
+                'rows_out': st.column_config.NumberColumn('Rows out', format='%d'),
+                'allocated_bytes': st.column_config.NumberColumn('Allocated (B)', format='%d'),
+                'peak_bytes': st.column_config.NumberColumn('Peak (B)', format='%d')
+            },
+            hide_index=True,
+            width="stretch"
+        )
+        st.download_button(
+            "Download Chrome trace", chrome_trace(events), file_name='dashboard-trace.json', mime='application/json'
+        )
 
 
 def main():
@@ -106,36 +235,63 @@ def main():
     
     setup_page()
     
+    # The panel toggle is drawn last, so its value from the previous run decides whether this run records
+    if PROFILING_SETTINGS['panel'] and st.session_state.get('debug_panel'):
+        start_run()
+    try:
+        run_dashboard()
+    finally:
+        events = finish_run()
+    
+    if PROFILING_SETTINGS['panel']:
+        render_debug_panel(events, get_session_cache().stats())
+
+
+def run_dashboard():
     render_header()
     
     with st.spinner('Loading data from dataset folder...'):
-        business_df, marketing_df = load_data()
+        business_df, marketing_cube, metric_index, data_version = load_dashboard_data()
     
-    if business_df is None or marketing_df is None:
+    if business_df is None or marketing_cube is None:
         st.error("Failed to load data. Please check that the dataset folder contains the required CSV files.")
         return
     
-    business_df, marketing_df = prepare_data(business_df, marketing_df)
-    
-    data_info = get_data_info(business_df, marketing_df)
+    data_info = get_data_info(business_df, marketing_cube)
     # st.success(f"✅ Data loaded successfully! Business data: {data_info['business_records']} records, Marketing data: {data_info['marketing_records']} records")
     
-    date_filter, selected_channel = create_sidebar_filters(business_df, marketing_df)
+    date_filter, end_date, selected_channel = create_sidebar_filters(business_df, marketing_cube)
     
-    combined_df, filtered_marketing = calculate_metrics(
-        business_df, marketing_df, date_filter, selected_channel
-    )
+    # Every stage below is memoized per session on the (data version, filters) key
+    cache = get_session_cache()
+    key = filter_key(data_version, date_filter, end_date, selected_channel)
     
-    metrics = create_executive_metrics(combined_df, filtered_marketing)
+    backend, marketing_source = select_query_backend(marketing_cube, data_version)
+    combined_df, filtered_marketing = cache.get_or_compute(
+        ('metrics',) + key, backend.calculate_metrics, business_df, marketing_source, date_filter, selected_channel, end_date
+    )
+    metrics = cache.get_or_compute(
+        ('executive',) + key, create_executive_metrics, metric_index, date_filter, selected_channel, end_date
+    )
+    # Shared by the insights, Channel Analysis and Budget Optimizer; view-specific frames are computed on demand
+    channel_performance = cache.get_or_compute(('channel',) + key, backend.calculate_channel_performance, filtered_marketing)
+    opportunities, improvements = cache.get_or_compute(
+        ('insights',) + key, generate_insights, channel_performance, metrics
+    )
+    weekly_spend = partial(compute_weekly_spend_history, cache, data_version, backend, business_df, marketing_source)
+    campaign_details = partial(compute_campaign_details, cache, key, backend, filtered_marketing)
+    mix_performance = partial(
+        compute_mix_performance, cache, data_version, backend, business_df, marketing_source, date_filter, end_date
+    )
     
     # Render executive summary
     render_executive_summary(metrics)
     
     # Render dashboard tabs
-    render_dashboard_tabs(combined_df, filtered_marketing, metrics)
+    render_dashboard_tabs(combined_df, weekly_spend, metrics, channel_performance, campaign_details, mix_performance)
     
     # Render insights and recommendations
-    render_insights_section(combined_df, filtered_marketing, metrics)
+    render_insights_section(opportunities, improvements)
 
 
 if __name__ == "__main__":
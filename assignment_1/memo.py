@@ -0,0 +1,58 @@
+from collections import OrderedDict
+import pandas as pd
+import streamlit as st
+from config import MEMO_SETTINGS
+
+
+class LRUCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get_or_compute(self, key, fn, *args, **kwargs):
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        
+        self.misses += 1
+        value = fn(*args, **kwargs)
+        self._entries[key] = value
+        
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        
+        return value
+    
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'maxsize': self.maxsize
+        }
+
+
+def get_session_cache(name='metrics_cache', maxsize=None):
+    if name not in st.session_state:
+        st.session_state[name] = LRUCache(maxsize or MEMO_SETTINGS['maxsize'])
+    return st.session_state[name]
+
+
+def _day_key(value):
+    # Relative periods are anchored on datetime.now(), so round them to the day
+    return None if value is None else pd.Timestamp(value).ceil('D')
+
+
+def filter_key(data_version, date_filter=None, end_date=None, channel_filter=None):
+    return (data_version, _day_key(date_filter), _day_key(end_date), channel_filter or 'All')
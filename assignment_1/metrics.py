@@ -1,21 +1,19 @@
 import pandas as pd
 import numpy as np
+from config import CAMPAIGN_RANKING
+from cube import slice_cube, roll_up_daily, widen_measures
+from instrumentation import instrument
 
+BUSINESS_TOTALS = ['total_revenue', 'no_of_orders', 'new_customers', 'gross_profit']
+MARKETING_TOTALS = ['spend', 'attributed_revenue']
 
-def calculate_metrics(business_df, marketing_df, date_filter=None, channel_filter=None):
+
+def combine_daily(business_df, marketing_daily, date_filter=None, end_date=None):
+    # marketing_daily has one row per date with the CUBE_MEASURES summed over the selected channels
     if date_filter:
         business_df = business_df[business_df['date'] >= date_filter]
-        marketing_df = marketing_df[marketing_df['date'] >= date_filter]
-    
-    if channel_filter and channel_filter != 'All':
-        marketing_df = marketing_df[marketing_df['channel'] == channel_filter]
-    
-    marketing_daily = marketing_df.groupby('date').agg({
-        'spend': 'sum',
-        'clicks': 'sum',
-        'impression': 'sum',
-        'attributed_revenue': 'sum'
-    }).reset_index()
+    if end_date:
+        business_df = business_df[business_df['date'] <= end_date]
     
     combined_df = pd.merge(business_df, marketing_daily, on='date', how='left')
     combined_df = combined_df.fillna(0)
@@ -28,22 +26,90 @@ def calculate_metrics(business_df, marketing_df, date_filter=None, channel_filte
     combined_df['aov'] = combined_df['total_revenue'] / combined_df['no_of_orders'].replace(0, np.nan)
     combined_df['new_customer_rate'] = combined_df['new_customers'] / combined_df['no_of_orders'].replace(0, np.nan)
     
-    return combined_df, marketing_df
+    return combined_df
+
+
+@instrument
+def calculate_metrics(business_df, marketing_cube, date_filter=None, channel_filter=None, end_date=None):
+    marketing_cube = slice_cube(marketing_cube, date_filter, channel_filter, end_date)
+    marketing_daily = roll_up_daily(marketing_cube).reset_index()
+    
+    return combine_daily(business_df, marketing_daily, date_filter, end_date), marketing_cube
+
+
+def _prefix_sum(values):
+    dtype = np.int64 if np.issubdtype(values.dtype, np.integer) else np.float64
+    return np.concatenate([np.zeros(1, dtype=dtype), np.cumsum(values, dtype=dtype)])
+
+
+@instrument
+def build_metric_index(business_df, marketing_cube):
+    business_daily = business_df.sort_values('date')
+    dates = pd.DatetimeIndex(business_daily['date'])
+    
+    prefix = {col: _prefix_sum(business_daily[col].to_numpy()) for col in BUSINESS_TOTALS}
+    
+    # Marketing totals are aligned to business dates, matching the left merge in calculate_metrics
+    channel_daily = widen_measures(marketing_cube, MARKETING_TOTALS).groupby(
+        [pd.Grouper(level='date'), 'channel'], observed=True
+    )[MARKETING_TOTALS].sum()
+    channel_daily = channel_daily.unstack('channel', fill_value=0).reindex(dates, fill_value=0)
+    
+    channels = ['All'] + channel_daily.columns.get_level_values('channel').unique().tolist()
+    for col in MARKETING_TOTALS:
+        prefix[('All', col)] = _prefix_sum(channel_daily[col].sum(axis=1).to_numpy())
+        for channel in channels[1:]:
+            prefix[(channel, col)] = _prefix_sum(channel_daily[(col, channel)].to_numpy())
+    
+    return {'dates': dates.to_numpy(), 'channels': channels, 'prefix': prefix}
+
+
+@instrument
+def extend_metric_index(metric_index, business_df, marketing_cube):
+    # business_df and marketing_cube hold only days after the last indexed date
+    addition = build_metric_index(business_df, marketing_cube)
+    channels = metric_index['channels'] + [c for c in addition['channels'] if c not in metric_index['channels']]
+    
+    prefix = {}
+    for key in set(metric_index['prefix']) | set(addition['prefix']):
+        old = metric_index['prefix'].get(key, np.zeros(len(metric_index['dates']) + 1))
+        new = addition['prefix'].get(key, np.zeros(len(addition['dates']) + 1))
+        prefix[key] = np.concatenate([old, old[-1] + new[1:]])
+    
+    return {
+        'dates': np.concatenate([metric_index['dates'], addition['dates']]),
+        'channels': channels,
+        'prefix': prefix
+    }
+
+
+def _window_bounds(dates, date_filter=None, end_date=None):
+    start = np.searchsorted(dates, pd.Timestamp(date_filter).to_datetime64(), 'left') if date_filter else 0
+    stop = np.searchsorted(dates, pd.Timestamp(end_date).to_datetime64(), 'right') if end_date else len(dates)
+    return start, max(start, stop)
 
 
-def create_executive_metrics(combined_df, marketing_df):
-    total_revenue = combined_df['total_revenue'].sum()
-    total_spend = combined_df['spend'].sum()
-    total_orders = combined_df['no_of_orders'].sum()
-    total_customers = combined_df['new_customers'].sum()
+@instrument
+def create_executive_metrics(metric_index, date_filter=None, channel_filter=None, end_date=None):
+    prefix = metric_index['prefix']
+    start, stop = _window_bounds(metric_index['dates'], date_filter, end_date)
+    channel = channel_filter if channel_filter in metric_index['channels'] else 'All'
     
-    overall_roas = total_spend > 0 and combined_df['attributed_revenue'].sum() / total_spend or 0
+    def window_sum(key, lo=start, hi=stop):
+        return prefix[key][hi] - prefix[key][lo]
+    
+    total_revenue = window_sum('total_revenue')
+    total_spend = window_sum((channel, 'spend'))
+    total_orders = window_sum('no_of_orders')
+    total_customers = window_sum('new_customers')
+    
+    overall_roas = total_spend > 0 and window_sum((channel, 'attributed_revenue')) / total_spend or 0
     avg_aov = total_orders > 0 and total_revenue / total_orders or 0
-    gross_margin = total_revenue > 0 and combined_df['gross_profit'].sum() / total_revenue or 0
+    gross_margin = total_revenue > 0 and window_sum('gross_profit') / total_revenue or 0
     
-    mid_point = len(combined_df) // 2
-    recent_revenue = combined_df.iloc[mid_point:]['total_revenue'].mean()
-    earlier_revenue = combined_df.iloc[:mid_point]['total_revenue'].mean()
+    mid_point = start + (stop - start) // 2
+    recent_revenue = window_sum('total_revenue', lo=mid_point) / (stop - mid_point) if stop > mid_point else 0
+    earlier_revenue = window_sum('total_revenue', hi=mid_point) / (mid_point - start) if mid_point > start else 0
     revenue_growth = (recent_revenue - earlier_revenue) / earlier_revenue * 100 if earlier_revenue > 0 else 0
     
     return {
@@ -58,14 +124,19 @@ def create_executive_metrics(combined_df, marketing_df):
     }
 
 
+@instrument
 def calculate_channel_performance(marketing_df):    
-    channel_performance = marketing_df.groupby('channel').agg({
+    channel_performance = widen_measures(marketing_df).groupby('channel', observed=True).agg({
         'spend': 'sum',
         'attributed_revenue': 'sum',
         'clicks': 'sum',
         'impression': 'sum'
     }).reset_index()
     
+    return channel_ratios(channel_performance)
+
+
+def channel_ratios(channel_performance):
     channel_performance['roas'] = channel_performance['attributed_revenue'] / channel_performance['spend']
     channel_performance['ctr'] = np.where(
         channel_performance['impression'] > 0,
@@ -81,44 +152,81 @@ def calculate_channel_performance(marketing_df):
     return channel_performance
 
 
+@instrument
 def calculate_campaign_performance(marketing_df):    
-    campaign_performance = marketing_df.groupby(['channel', 'campaign']).agg({
+    campaign_performance = widen_measures(marketing_df).groupby(['channel', 'campaign'], observed=True).agg({
         'spend': 'sum',
         'attributed_revenue': 'sum',
         'clicks': 'sum',
         'impression': 'sum'
     }).reset_index()
     
-    campaign_performance['roas'] = campaign_performance['attributed_revenue'] / campaign_performance['spend']
-    campaign_performance = campaign_performance.sort_values('roas', ascending=False)
+    return campaign_ratios(campaign_performance)
+
+
+def campaign_ratios(campaign_performance):
+    campaign_performance['roas'] = campaign_performance['attributed_revenue'] / campaign_performance['spend'].replace(0, np.nan)
     
     return campaign_performance
 
 
+def _select_descending(candidates, values, k):
+    # argpartition picks the k candidates in O(n); only those k are then sorted
+    selected = candidates[np.argpartition(-values[candidates], k - 1)[:k]]
+    return selected[np.argsort(-values[selected], kind='stable')]
+
+
+@instrument
+def rank_campaigns(campaign_performance, k=None, min_spend=None):
+    k = k or CAMPAIGN_RANKING['k']
+    min_spend = CAMPAIGN_RANKING['min_spend'] if min_spend is None else min_spend
+    
+    roas = campaign_performance['roas'].to_numpy(dtype=float)
+    spend = campaign_performance['spend'].to_numpy(dtype=float)
+    
+    # Zero-spend campaigns have no ROAS and are left out of both lists
+    eligible = np.flatnonzero((spend >= min_spend) & np.isfinite(roas))
+    k = min(k, len(eligible))
+    if k == 0:
+        return campaign_performance.iloc[:0], campaign_performance.iloc[:0]
+    
+    top = _select_descending(eligible, roas, k)
+    bottom = _select_descending(eligible, -roas, k)[::-1]
+    
+    return campaign_performance.iloc[top], campaign_performance.iloc[bottom]
+
+
+@instrument
 def calculate_tactic_performance(marketing_df):    
-    tactic_performance = marketing_df.groupby(['channel', 'tactic']).agg({
+    tactic_performance = widen_measures(marketing_df).groupby(['channel', 'tactic'], observed=True).agg({
         'spend': 'sum',
         'attributed_revenue': 'sum',
         'clicks': 'sum',
         'impression': 'sum'
     }).reset_index()
     
+    return tactic_ratios(tactic_performance)
+
+
+def tactic_ratios(tactic_performance):
     tactic_performance['roas'] = tactic_performance['attributed_revenue'] / tactic_performance['spend']
     tactic_performance['ctr'] = tactic_performance['clicks'] / tactic_performance['impression'] * 100
     
     return tactic_performance
 
 
-def format_metrics_for_display(df, columns_to_format):    
-    display_df = df.copy()
-    
-    for col, format_type in columns_to_format.items():
-        if col in display_df.columns:
-            if format_type == 'currency':
-                display_df[col] = display_df[col].apply(lambda x: f"${x:,.0f}")
-            elif format_type == 'percentage':
-                display_df[col] = display_df[col].apply(lambda x: f"{x:.2f}%")
-            elif format_type == 'multiplier':
-                display_df[col] = display_df[col].apply(lambda x: f"{x:.2f}x")
-    
-    return display_df
+@instrument
+def calculate_weekly_channel_spend(marketing_df):
+    # Weeks end on Sunday; one spend column per channel
+    weekly = widen_measures(marketing_df, ['spend']).groupby(
+        [pd.Grouper(level='date', freq='W'), 'channel'], observed=True
+    )['spend'].sum()
+    return weekly.unstack('channel', fill_value=0)
+
+
+# The same formats as st.column_config.NumberColumn options, applied in the browser
+DISPLAY_NUMBER_FORMATS = {
+    'currency': {'format': 'dollar', 'step': 1},
+    'percentage': {'format': '%.2f%%'},
+    'multiplier': {'format': '%.2fx'}
+}
@@ -0,0 +1,139 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import streamlit as st
+from config import MMM_SETTINGS
+
+_package_dir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), MMM_SETTINGS['package_dir']))
+if _package_dir not in sys.path:
+    # Appended, so modules in this folder keep precedence over same-named ones there
+    sys.path.append(_package_dir)
+
+try:
+    from mmm.config import SPEND_CHANNELS, RESPONSE_CURVE_SETTINGS
+    from mmm.optimizer import optimize_budget, predict_revenue, spend_history_frame
+    from mmm import attribution, response_curves
+    MMM_IMPORT_ERROR = None
+except ImportError as e:
+    # The rest of the dashboard works without the model; its sections show why they are off
+    SPEND_CHANNELS, optimize_budget, predict_revenue, spend_history_frame = [], None, None, None
+    RESPONSE_CURVE_SETTINGS = {}
+    attribution, response_curves = None, None
+    MMM_IMPORT_ERROR = str(e)
+
+
+DRIVER_LABELS = {
+    'pred_ln_google': 'Social spend (via Google)',
+    'ln_google_spend_adstock': 'Google spend (adstocked)',
+    'bias': 'Baseline'
+}
+
+
+def channel_label(spend_channel):
+    labels = {column: channel for channel, column in MMM_SETTINGS['channel_map'].items()}
+    return labels.get(spend_channel, spend_channel.replace('_spend', '').capitalize())
+
+
+def held_channel_spend():
+    # Model channels the business does not run have no dashboard data; scoring them at zero spend
+    # (ln 1e-6) is far outside the training data, so they are held at the response curves' base spend
+    mapped = set(MMM_SETTINGS['channel_map'].values())
+    return {ch: float(RESPONSE_CURVE_SETTINGS['base_spend']) for ch in SPEND_CHANNELS if ch not in mapped}
+
+
+def budget_channels():
+    held = held_channel_spend()
+    return [ch for ch in SPEND_CHANNELS if ch not in held]
+
+
+def current_weekly_allocation(channel_performance, combined_df):
+    # Average weekly spend per model channel over the selected period; held channels at their fixed spend
+    weeks = max(combined_df['date'].nunique() / 7, 1)
+    spend = channel_performance.set_index('channel')['spend']
+    held = held_channel_spend()
+    
+    allocation = np.array([held.get(column, 0.0) for column in SPEND_CHANNELS])
+    for channel, column in MMM_SETTINGS['channel_map'].items():
+        if channel in spend.index and column in SPEND_CHANNELS:
+            allocation[SPEND_CHANNELS.index(column)] = spend[channel] / weeks
+    
+    return allocation
+
+
+@st.cache_data
+def run_budget_optimizer(total_budget, bounds, reference):
+    # bounds is a tuple of (channel, min, max) and reference a tuple, so the call is hashable for the cache
+    return optimize_budget(
+        total_budget, {channel: (low, high) for channel, low, high in bounds},
+        fixed_spend=held_channel_spend(), reference=np.array(reference)
+    )
+
+
+@st.cache_data
+def predict_allocation_revenue(allocation):
+    return float(predict_revenue(np.array([allocation], dtype=float))[0])
+
+
+def allocation_table(current, recommended):
+    return pd.DataFrame({
+        'channel': [channel_label(c) for c in SPEND_CHANNELS],
+        'Current': current,
+        'Recommended': recommended
+    })
+
+
+@st.cache_resource
+def get_response_curves():
+    # Loaded from the precomputed file (built on first use), then shared by every session
+    return response_curves.get_response_curves()
+
+
+def marginal_returns_table(curves, current, delta):
+    rows = []
+    for channel, column in MMM_SETTINGS['channel_map'].items():
+        spend = current[SPEND_CHANNELS.index(column)]
+        rows.append({
+            'channel': channel,
+            'weekly_spend': spend,
+            'predicted_revenue': float(response_curves.revenue_at(curves, column, spend)),
+            'marginal_roas': float(response_curves.marginal_roas(curves, column, spend, delta)),
+            'saturation_spend': response_curves.saturation_spend(curves, column)
+        })
+    return pd.DataFrame(rows)
+
+
+def response_curve_frame(curves):
+    frames = []
+    for channel, column in MMM_SETTINGS['channel_map'].items():
+        frames.append(pd.DataFrame({
+            'channel': channel,
+            'spend': curves['spend'],
+            'revenue': response_curves.revenue_at(curves, column, curves['spend'])
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def weekly_spend_history(weekly):
+    # weekly has one spend column per dashboard channel; model channels it does not cover stay at zero
+    spend = np.zeros((len(weekly), len(SPEND_CHANNELS)))
+    for channel, column in MMM_SETTINGS['channel_map'].items():
+        if channel in weekly.columns and column in SPEND_CHANNELS:
+            spend[:, SPEND_CHANNELS.index(column)] = weekly[channel].to_numpy()
+    
+    return weekly.index.to_numpy(), spend
+
+
+@st.cache_data
+def weekly_revenue_drivers(weeks, spend):
+    # Weeks attributed before (by this model version) come from the on-disk cache
+    attributions, _ = attribution.attribute_weeks(spend_history_frame(weeks, spend))
+    return attributions
+
+
+def driver_table(attributions, week):
+    decomposition = attribution.driver_decomposition(attributions, week)
+    return pd.DataFrame({
+        'driver': [DRIVER_LABELS.get(f, f.replace('_', ' ').capitalize()) for f in decomposition.index],
+        'contribution': decomposition.to_numpy(dtype=float)
+    })
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+
+def _freeze_array(array):
+    # Datetime and categorical arrays keep their values (or codes) in a numpy array under _ndarray
+    values = getattr(array, '_ndarray', array)
+    if isinstance(values, np.ndarray):
+        values.flags.writeable = False
+
+
+def freeze(value):
+    """Marks every numpy buffer under value read-only, so an in-place write raises instead of changing shared data."""
+    if isinstance(value, pd.DataFrame):
+        # Blocks hold the columns as 2-D arrays; freezing a column's 1-D view would leave the block writeable
+        for array in value._mgr.arrays:
+            _freeze_array(array)
+        _freeze_array(value.index.array)
+    elif isinstance(value, pd.Series):
+        _freeze_array(value.array)
+        _freeze_array(value.index.array)
+    elif isinstance(value, pd.Index):
+        _freeze_array(value.array)
+    elif isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for item in value.values():
+            freeze(item)
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            freeze(item)
+    return value
+
+
+def shared_view(value):
+    """New frame objects over the same frozen buffers; a session may add or replace columns on its own view."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return {key: shared_view(item) for key, item in value.items()}
+    if isinstance(value, (tuple, list)):
+        return type(value)(shared_view(item) for item in value)
+    return value
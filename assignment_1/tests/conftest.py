@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the dashboard modules the way the benchmarks do, from assignment_1
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
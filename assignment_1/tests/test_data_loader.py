@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import generate_dataset
+from config import DATA_FILES, DATA_SCHEMA, INGESTION_SETTINGS
+from data_cache import source_signature
+from data_loader import load_dataset, read_data, read_marketing_cube_streaming
+
+
+def _blank_cells(path, column, rows):
+    frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+    frame.loc[rows, column] = ''
+    frame.to_csv(path, index=False)
+
+
+def test_blank_counts_read_as_zero(tmp_path):
+    dataset_dir = str(tmp_path)
+    marketing_files = generate_dataset(dataset_dir, days=30, campaigns=2)
+    channel = next(iter(marketing_files))
+    _blank_cells(os.path.join(dataset_dir, DATA_FILES['business']), '# of orders', [0, 5])
+    _blank_cells(os.path.join(dataset_dir, marketing_files[channel]), 'clicks', [1])
+
+    business_df, marketing_df = read_data(dataset_dir, None, marketing_files)
+
+    assert business_df is not None and marketing_df is not None
+    assert set(marketing_df['channel'].unique()) == set(marketing_files)
+    for kind, frame in [('business', business_df), ('marketing', marketing_df)]:
+        for col, dtype in DATA_SCHEMA[kind].items():
+            if dtype == 'int32':
+                assert frame[col].dtype == np.int32
+    assert business_df['no_of_orders'].iloc[[0, 5]].tolist() == [0, 0]
+    assert marketing_df.loc[marketing_df['channel'] == channel, 'clicks'].iloc[1] == 0
+
+    marketing_cube, _ = read_marketing_cube_streaming(dataset_dir, chunk_size=7, marketing_files=marketing_files)
+    assert marketing_cube['clicks'].sum() == marketing_df['clicks'].sum()
+
+
+def _append_last_row(path):
+    with open(path) as f:
+        last_row = f.read().splitlines()[-1]
+    with open(path, 'a') as f:
+        f.write(last_row + '\n')
+
+
+def test_rows_appended_after_measuring_are_not_parsed(tmp_path, monkeypatch):
+    dataset_dir = str(tmp_path / 'dataset')
+    marketing_files = generate_dataset(dataset_dir, days=30, campaigns=2)
+    monkeypatch.setitem(DATA_FILES, 'marketing', marketing_files)
+    paths = [os.path.join(dataset_dir, DATA_FILES['business'])]
+    paths += [os.path.join(dataset_dir, filename) for filename in marketing_files.values()]
+    signatures = {path: source_signature(path) for path in paths}
+
+    expected = {}
+    for mode in ['full', 'streaming']:
+        monkeypatch.setitem(INGESTION_SETTINGS, 'mode', mode)
+        expected[mode] = load_dataset(dataset_dir)
+    for path in paths:
+        _append_last_row(path)
+
+    for mode, (expected_business, expected_cube, _) in expected.items():
+        monkeypatch.setitem(INGESTION_SETTINGS, 'mode', mode)
+        for cache_dir in [None, str(tmp_path / 'cache')]:
+            business_df, marketing_cube, _ = load_dataset(dataset_dir, cache_dir, signatures)
+            pd.testing.assert_frame_equal(business_df, expected_business)
+            pd.testing.assert_frame_equal(marketing_cube, expected_cube)
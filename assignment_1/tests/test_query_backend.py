@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import duckdb_backend
+from benchmarks.bench_query_backend import PERFORMANCE, load_backend, run_queries, scenarios, sorted_frame
+from benchmarks.synthetic_data import generate_dataset
+
+MONEY_COLUMNS = {'spend', 'attributed_revenue'}
+
+pytestmark = pytest.mark.skipif(duckdb_backend.duckdb is None, reason="duckdb is not installed")
+
+
+@pytest.fixture(scope='module')
+def backends(tmp_path_factory):
+    dataset_dir = str(tmp_path_factory.mktemp('dataset'))
+    marketing_files = generate_dataset(dataset_dir, days=60, campaigns=20)
+    loaded = {
+        backend: load_backend(backend, dataset_dir, marketing_files, None) for backend in ['pandas', 'duckdb']
+    }
+    return loaded, list(marketing_files)
+
+
+def test_backends_return_the_same_frames(backends):
+    loaded, channels = backends
+    for name, filters in scenarios(loaded['pandas'][0], channels):
+        expected = run_queries('pandas', *loaded['pandas'], filters)
+        actual = run_queries('duckdb', *loaded['duckdb'], filters)
+        assert list(actual) == list(expected)
+        for frame_name in expected:
+            keys = PERFORMANCE[frame_name][1] if frame_name in PERFORMANCE else ['date']
+            # pandas keeps int32 for integer sums that fit; money sums are float64 on both sides
+            pd.testing.assert_frame_equal(
+                sorted_frame(actual[frame_name], keys), sorted_frame(expected[frame_name], keys),
+                check_dtype=False, check_categorical=False, rtol=1e-9, obj=f"{name} / {frame_name}"
+            )
+            for col in MONEY_COLUMNS.intersection(expected[frame_name].columns):
+                assert actual[frame_name][col].dtype == expected[frame_name][col].dtype == np.float64
@@ -1,9 +1,95 @@
+import numpy as np
+import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from config import COLORS
+from config import COLORS, CHART_SETTINGS
+from memo import get_session_cache
+from instrumentation import instrument
 
+def _numeric_axis(x):
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(float)
+    return x.to_numpy(dtype=float)
 
+
+def lttb_indices(x, y, max_points):
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    
+    x = _numeric_axis(x)
+    y = np.nan_to_num(pd.Series(y).to_numpy(dtype=float))
+    
+    # Largest-Triangle-Three-Buckets: first and last points are always kept
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    selected = np.empty(max_points, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    
+    for i in range(max_points - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[stop:next_stop].mean()
+        avg_y = y[stop:next_stop].mean()
+        prev = selected[i]
+        
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:stop] - y[prev]) - (x[prev] - x[start:stop]) * (avg_y - y[prev])
+        )
+        selected[i + 1] = start + int(np.argmax(area))
+    
+    return selected
+
+
+def minmax_indices(y, max_points):
+    n = len(y)
+    if max_points >= n or max_points < 4:
+        return np.arange(n)
+    
+    y = np.nan_to_num(pd.Series(y).to_numpy(dtype=float))
+    selected = []
+    for bucket in np.array_split(np.arange(n), max_points // 2):
+        selected.extend([bucket[np.argmin(y[bucket])], bucket[np.argmax(y[bucket])]])
+    
+    return np.unique(selected)
+
+
+def downsample_indices(x, y, max_points=None):
+    max_points = max_points or CHART_SETTINGS['max_points']
+    if CHART_SETTINGS['downsampling'] == 'minmax':
+        return minmax_indices(y, max_points)
+    return lttb_indices(x, y, max_points)
+
+
+def _use_webgl(n_points):
+    return n_points > CHART_SETTINGS['webgl_threshold']
+
+
+def _line_trace(x, y, **kwargs):
+    trace_type = go.Scattergl if _use_webgl(len(y)) else go.Scatter
+    idx = downsample_indices(x, y)
+    return trace_type(x=pd.Series(x).iloc[idx], y=pd.Series(y).iloc[idx], **kwargs)
+
+
+def _fingerprint(value):
+    if isinstance(value, pd.DataFrame):
+        return (value.shape, tuple(value.columns), int(pd.util.hash_pandas_object(value).sum()))
+    if isinstance(value, dict):
+        return tuple(sorted((k, _fingerprint(v)) for k, v in value.items()))
+    return value
+
+
+def cached_figure(builder, *args):
+    # Kept per session so no two sessions share a figure; the dict is not rebuilt on reruns with the same data
+    key = (builder.__name__,) + tuple(_fingerprint(arg) for arg in args)
+    cache = get_session_cache('figure_cache', CHART_SETTINGS['figure_cache_size'])
+    figure = cache.get_or_compute(key, lambda: builder(*args).to_dict())
+    # Plotly rejects a dict without traces, so a chart with no data is handed over as a Figure
+    return figure if figure['data'] else go.Figure(figure)
+
+
+@instrument
 def create_performance_trends_chart(combined_df):    
     fig = make_subplots(
         rows=2, cols=2,
@@ -12,35 +98,35 @@ def create_performance_trends_chart(combined_df):
     )
     
     fig.add_trace(
-        go.Scatter(x=combined_df['date'], y=combined_df['total_revenue'], 
+        _line_trace(combined_df['date'], combined_df['total_revenue'], 
                   name='Revenue', line=dict(color=COLORS['revenue'])), 
         row=1, col=1
     )
     fig.add_trace(
-        go.Scatter(x=combined_df['date'], y=combined_df['spend'], 
+        _line_trace(combined_df['date'], combined_df['spend'], 
                   name='Marketing Spend', line=dict(color=COLORS['spend'])), 
         row=1, col=1, secondary_y=True
     )
     
     fig.add_trace(
-        go.Scatter(x=combined_df['date'], y=combined_df['marketing_roas'], 
+        _line_trace(combined_df['date'], combined_df['marketing_roas'], 
                   name='ROAS', line=dict(color=COLORS['roas'])),
         row=1, col=2
     )
     
     fig.add_trace(
-        go.Scatter(x=combined_df['date'], y=combined_df['no_of_orders'], 
+        _line_trace(combined_df['date'], combined_df['no_of_orders'], 
                   name='Total Orders', line=dict(color=COLORS['orders'])),
         row=2, col=1
     )
     fig.add_trace(
-        go.Scatter(x=combined_df['date'], y=combined_df['no_of_new_orders'], 
+        _line_trace(combined_df['date'], combined_df['no_of_new_orders'], 
                   name='New Orders', line=dict(color=COLORS['new_orders'])),
         row=2, col=1
     )
     
     fig.add_trace(
-        go.Scatter(x=combined_df['date'], y=combined_df['new_customers'], 
+        _line_trace(combined_df['date'], combined_df['new_customers'], 
                   name='New Customers', line=dict(color=COLORS['customers'])),
         row=2, col=2
     )
@@ -49,6 +135,7 @@ def create_performance_trends_chart(combined_df):
     return fig
 
 
+@instrument
 def create_channel_roas_chart(channel_performance):    
     fig = px.bar(
         channel_performance, 
@@ -62,6 +149,7 @@ def create_channel_roas_chart(channel_performance):
     return fig
 
 
+@instrument
 def create_spend_allocation_chart(channel_performance):    
     fig = px.pie(
         channel_performance, 
@@ -72,18 +160,22 @@ def create_spend_allocation_chart(channel_performance):
     return fig
 
 
+@instrument
 def create_margin_trend_chart(combined_df):    
+    idx = downsample_indices(combined_df['date'], combined_df['gross_margin'])
     fig = px.line(
-        combined_df, 
+        combined_df.iloc[idx], 
         x='date', 
         y='gross_margin',
         title='Gross Margin Trend',
-        labels={'gross_margin': 'Gross Margin (%)', 'date': 'Date'}
+        labels={'gross_margin': 'Gross Margin (%)', 'date': 'Date'},
+        render_mode='webgl' if _use_webgl(len(combined_df)) else 'svg'
     )
     fig.update_traces(line_color=COLORS['revenue'])
     return fig
 
 
+@instrument
 def create_cost_breakdown_chart(metrics, combined_df):    
     costs_data = {
         'Category': ['Revenue', 'COGS', 'Marketing Spend', 'Gross Profit'],
@@ -107,6 +199,7 @@ def create_cost_breakdown_chart(metrics, combined_df):
     return fig
 
 
+@instrument
 def create_efficiency_scatter_chart(combined_df):    
     daily_efficiency = combined_df[combined_df['spend'] > 0].copy()
     
@@ -122,7 +215,8 @@ def create_efficiency_scatter_chart(combined_df):
             'attributed_revenue': 'Daily Attributed Revenue ($)',
             'marketing_roas': 'ROAS'
         },
-        color_continuous_scale='Viridis'
+        color_continuous_scale='Viridis',
+        render_mode='webgl' if _use_webgl(len(daily_efficiency)) else 'svg'
     )
     
     max_spend = daily_efficiency['spend'].max()
@@ -139,6 +233,7 @@ def create_efficiency_scatter_chart(combined_df):
     return fig
 
 
+@instrument
 def create_tactic_performance_chart(tactic_performance):
     fig = px.scatter(
         tactic_performance,
@@ -148,7 +243,61 @@ def create_tactic_performance_chart(tactic_performance):
         size='clicks',
         hover_data=['tactic', 'ctr'],
         title='Tactic Performance: Spend vs ROAS',
-        labels={'spend': 'Total Spend ($)', 'roas': 'ROAS'}
+        labels={'spend': 'Total Spend ($)', 'roas': 'ROAS'},
+        render_mode='webgl' if _use_webgl(len(tactic_performance)) else 'svg'
     )
     
     return fig
+
+
+@instrument
+def create_budget_allocation_chart(allocation_df):
+    fig = px.bar(
+        allocation_df.melt(id_vars='channel', var_name='Allocation', value_name='spend'),
+        x='channel',
+        y='spend',
+        color='Allocation',
+        barmode='group',
+        title='Weekly Budget Allocation',
+        labels={'spend': 'Weekly Spend ($)', 'channel': 'Channel'},
+        color_discrete_map={'Current': COLORS['spend'], 'Recommended': COLORS['revenue']}
+    )
+    return fig
+
+
+@instrument
+def create_response_curve_chart(curve_df, marginal_df):
+    fig = px.line(
+        curve_df,
+        x='spend',
+        y='revenue',
+        color='channel',
+        title='Modeled Weekly Revenue Response by Channel',
+        labels={'spend': 'Weekly Spend ($)', 'revenue': 'Predicted Weekly Revenue ($)'}
+    )
+    fig.add_trace(go.Scatter(
+        x=marginal_df['weekly_spend'],
+        y=marginal_df['predicted_revenue'],
+        mode='markers',
+        marker=dict(size=10, symbol='diamond', color=COLORS['spend']),
+        text=marginal_df['channel'],
+        name='Current spend'
+    ))
+    return fig
+
+
+@instrument
+def create_driver_decomposition_chart(driver_df, week_label):
+    drivers = driver_df.iloc[::-1]
+    fig = go.Figure(go.Bar(
+        x=drivers['contribution'],
+        y=drivers['driver'],
+        orientation='h',
+        marker_color=[COLORS['revenue'] if v >= 0 else COLORS['spend'] for v in drivers['contribution']]
+    ))
+    fig.update_layout(
+        title=f'Modeled Revenue Drivers, Week of {week_label}',
+        xaxis_title='Contribution to ln(Revenue)',
+        yaxis_title=''
+    )
+    return fig
@@ -0,0 +1,62 @@
+"""Per-element adstock loop vs the batched lfilter grid.
+
+Usage (from assignment_2):
+    python benchmarks/bench_adstock.py --channels 5
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import random_spend, time_call
+from mmm.adstock import adstock_grid, weibull_adstock_grid
+from mmm.config import ADSTOCK_SETTINGS
+
+
+def loop_adstock(series, rate=0.5):
+    # The original notebook implementation
+    result = np.zeros(len(series))
+    prev = 0.0
+    for i, x in enumerate(series):
+        prev = x + rate * prev
+        result[i] = prev
+    return result
+
+
+def loop_grid(spend, rates):
+    grid = np.empty((len(rates),) + spend.shape)
+    for i, rate in enumerate(rates):
+        for ch in range(spend.shape[1]):
+            grid[i, :, ch] = loop_adstock(spend[:, ch], rate)
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--channels', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rates = ADSTOCK_SETTINGS['rates_grid']
+    weibull_params = [(shape, scale) for shape in (0.5, 1.0, 2.0) for scale in (1.0, 3.0, 6.0)]
+
+    for label, periods in [('weekly, 2 years', 104), ('weekly, 20 years', 1040), ('daily, 10 years', 3650)]:
+        spend = random_spend(periods, args.channels)
+
+        loop = time_call(lambda: loop_grid(spend, rates), args.repeat)
+        batched = time_call(lambda: adstock_grid(spend, rates), args.repeat)
+        weibull = time_call(lambda: weibull_adstock_grid(spend, weibull_params), args.repeat)
+
+        assert np.allclose(loop_grid(spend, rates), adstock_grid(spend, rates))
+
+        print(f"{label} ({periods} periods x {args.channels} channels x {len(rates)} rates)")
+        print(f"  python loop   : {loop * 1000:8.2f} ms")
+        print(f"  lfilter grid  : {batched * 1000:8.2f} ms  ({loop / batched:.0f}x faster)")
+        print(f"  weibull grid  : {weibull * 1000:8.2f} ms  ({len(weibull_params)} shape/scale pairs)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Wall time per model per fold for the walk-forward backtest, sequential vs parallel.
+
+Usage (from assignment_2):
+    python benchmarks/bench_backtest.py --weeks 520 --executor process
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.linear_model import Ridge
+
+from benchmarks.common import synthetic_weekly_frame
+from mmm.backtest import run_backtest, default_models
+from mmm.config import SOCIAL_FEATURES, MEDIATOR, MEDIATOR_PREDICTION, STAGE2_FEATURES, TARGET
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--weeks', type=int, default=520)
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process')
+    parser.add_argument('--max-workers', type=int, default=None)
+    args = parser.parse_args()
+
+    df = synthetic_weekly_frame(args.weeks)
+    stage1_model = Ridge(alpha=1.0).fit(df[SOCIAL_FEATURES], df[MEDIATOR])
+    df[MEDIATOR_PREDICTION] = stage1_model.predict(df[SOCIAL_FEATURES])
+    inputs = (df[SOCIAL_FEATURES], df[MEDIATOR], df[STAGE2_FEATURES], df[TARGET], stage1_model, default_models())
+
+    for label, executor in [('sequential', None), (args.executor, args.executor)]:
+        start = time.perf_counter()
+        results = run_backtest(*inputs, settings={'executor': executor, 'max_workers': args.max_workers})
+        wall = time.perf_counter() - start
+
+        per_model = results.groupby('model')[['fit_seconds', 'predict_seconds']].agg(['mean', 'max']) * 1000
+        print(f"{label}: {results['fold'].nunique()} folds in {wall:.2f} s")
+        print(per_model.round(2).to_string())
+        print()
+
+
+if __name__ == '__main__':
+    main()
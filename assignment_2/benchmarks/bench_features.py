@@ -0,0 +1,84 @@
+"""Column-by-column feature engineering (as in the notebook) vs the one-block feature pipeline.
+
+Usage (from assignment_2):
+    python benchmarks/bench_features.py --weeks 10000
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import synthetic_raw_frame, time_call
+from mmm.adstock import adstock
+from mmm.config import EPS, SPEND_CHANNELS
+from mmm.features import fit_features, transform_features
+
+
+def column_by_column(df, rates):
+    # The original notebook cells: every step adds a column to df
+    df = df.copy()
+    for col in ['revenue'] + SPEND_CHANNELS:
+        df[f'ln_{col}'] = np.log(df[col] + EPS)
+    for lag in [1, 2, 3]:
+        for s in SPEND_CHANNELS:
+            df[f'{s}_lag{lag}'] = df[s].shift(lag)
+
+    df['week_of_year'] = df['week'].dt.isocalendar().week.astype(int)
+    df['week_sin'] = np.sin(2 * np.pi * df['week_of_year'] / 52)
+    df['week_cos'] = np.cos(2 * np.pi * df['week_of_year'] / 52)
+    df['promotions_bin'] = df['promotions']
+    df['price_dev'] = df['average_price'] - df['average_price'].mean()
+    for c in ['emails_send', 'sms_send']:
+        df[c] = df[c].fillna(0)
+    df = df.dropna().reset_index(drop=True)
+
+    for s in SPEND_CHANNELS:
+        df[f'{s}_adstock'] = adstock(df[s].fillna(0).values, rate=rates[s])
+        df[f'ln_{s}_adstock'] = np.log(df[f'{s}_adstock'] + EPS)
+    return df
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--weeks', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    raw = synthetic_raw_frame(args.weeks)
+    state = fit_features(raw, {ch: 0.3 + 0.1 * i for i, ch in enumerate(SPEND_CHANNELS)})
+
+    reference = column_by_column(raw, state['adstock_rates'])
+    features = transform_features(raw, state)
+    columns = state['columns']
+    max_diff = np.abs(reference[columns].to_numpy(dtype=float) - features[columns].to_numpy()).max()
+
+    timings = {
+        'column-by-column': time_call(lambda: column_by_column(raw, state['adstock_rates']), args.repeat),
+        'pipeline': time_call(lambda: transform_features(raw, state), args.repeat)
+    }
+    peaks = {
+        'column-by-column': peak_memory(lambda: column_by_column(raw, state['adstock_rates'])),
+        'pipeline': peak_memory(lambda: transform_features(raw, state))
+    }
+
+    print(f"weeks: {args.weeks:,}  features: {len(columns)}  max abs diff: {max_diff:.2e}")
+    for name in timings:
+        print(f"{name:17s}: {timings[name] * 1000:8.1f} ms  peak {peaks[name] / 2**20:7.1f} MiB")
+    print(f"speedup: {timings['column-by-column'] / timings['pipeline']:.1f}x  "
+          f"memory: {peaks['column-by-column'] / peaks['pipeline']:.1f}x less")
+
+
+if __name__ == '__main__':
+    main()
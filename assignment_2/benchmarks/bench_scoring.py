@@ -0,0 +1,51 @@
+"""Scenario scoring throughput: unpickle-and-predict per request vs the preloaded registry.
+
+Usage (from assignment_2):
+    python benchmarks/bench_scoring.py --requests 20
+"""
+import argparse
+import os
+import sys
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import synthetic_weekly_frame, time_call
+from mmm.config import SOCIAL_FEATURES, MEDIATOR_PREDICTION, STAGE2_FEATURES, MODEL_REGISTRY
+from mmm.scoring import SCORING_FEATURES, get_model_dir, get_registry, score_batch
+
+
+def score_from_disk(rows):
+    # What re-running the notebook cells amounts to: unpickle, then predict through sklearn/xgboost
+    model_dir = get_model_dir()
+    stage1 = joblib.load(os.path.join(model_dir, MODEL_REGISTRY['stage1']))
+    stage2 = joblib.load(os.path.join(model_dir, MODEL_REGISTRY['stage2']['xgb']))
+    X2 = rows.assign(**{MEDIATOR_PREDICTION: stage1.predict(rows[SOCIAL_FEATURES])})[STAGE2_FEATURES]
+    return stage2.predict(X2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20, help='Requests timed per batch size')
+    args = parser.parse_args()
+
+    frame = synthetic_weekly_frame(10000)
+    get_registry()
+
+    baseline = time_call(lambda: score_from_disk(frame.iloc[:1]), 3)
+    print(f"unpickle + predict, 1 row: {baseline * 1000:8.2f} ms/request")
+
+    for batch_size in (1, 100, 10000):
+        rows = frame.iloc[:batch_size]
+        X = rows[SCORING_FEATURES].to_numpy(dtype=float)
+        assert np.allclose(score_batch(X)['pred_ln_revenue'], score_from_disk(rows), atol=1e-5)
+
+        per_request = time_call(lambda: [score_batch(X) for _ in range(args.requests)], 3) / args.requests
+        print(f"registry, {batch_size:>5} rows : {per_request * 1000:8.3f} ms/request "
+              f"({batch_size / per_request:,.0f} scenarios/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from mmm.adstock import adstock
+from mmm.config import EPS, SPEND_CHANNELS, ADSTOCK_SETTINGS
+
+
+def random_spend(periods, channels, seed=0):
+    rng = np.random.default_rng(seed)
+    # Right-skewed, occasionally dark channels like the weekly export
+    spend = rng.lognormal(mean=8.0, sigma=1.0, size=(periods, channels))
+    spend[rng.random((periods, channels)) < 0.1] = 0.0
+    return spend
+
+
+def synthetic_raw_frame(periods, seed=0):
+    # Columns of the weekly export, with revenue driven by spend
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'week': pd.date_range('2020-01-05', periods=periods, freq='W')})
+    df[SPEND_CHANNELS] = random_spend(periods, len(SPEND_CHANNELS), seed)
+    df['social_followers'] = 1000 + np.cumsum(rng.integers(0, 100, periods))
+    df['average_price'] = 50 + rng.normal(0, 3, periods)
+    df['promotions'] = rng.integers(0, 2, periods)
+    df['emails_send'] = rng.integers(0, 10000, periods)
+    df['sms_send'] = rng.integers(0, 5000, periods)
+    # Multiplicative noise keeps revenue positive, so ln_revenue is always defined
+    df['revenue'] = (1000 + 0.5 * df['google_spend'] + 0.3 * df['facebook_spend']) * rng.lognormal(0, 0.3, periods)
+    return df
+
+
+def synthetic_weekly_frame(periods, seed=0):
+    # Same columns the notebook derives from the weekly export
+    df = synthetic_raw_frame(periods, seed)
+    df['promotions_bin'] = df['promotions']
+
+    for col in ['revenue'] + SPEND_CHANNELS:
+        df[f'ln_{col}'] = np.log(df[col] + EPS)
+    for col in SPEND_CHANNELS:
+        df[f'ln_{col}_adstock'] = np.log(adstock(df[col].to_numpy(), ADSTOCK_SETTINGS['default_rate']) + EPS)
+
+    week_of_year = df['week'].dt.isocalendar().week.astype(int)
+    df['week_sin'] = np.sin(2 * np.pi * week_of_year / 52)
+    df['week_cos'] = np.cos(2 * np.pi * week_of_year / 52)
+    df['price_dev'] = df['average_price'] - df['average_price'].mean()
+
+    missing = df.columns[df.isna().any()].tolist()
+    if missing:
+        raise ValueError(f"Synthetic frame has NaN in {missing}")
+    return df
+
+
+def time_call(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
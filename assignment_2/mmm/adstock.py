@@ -0,0 +1,57 @@
+import numpy as np
+from scipy.signal import lfilter
+from scipy.stats import weibull_min
+
+from .config import ADSTOCK_SETTINGS
+
+
+def _as_matrix(spend):
+    # Time runs along axis 0; a single series becomes one column
+    spend = np.asarray(spend, dtype=float)
+    return spend[:, None] if spend.ndim == 1 else spend
+
+
+def adstock(series, rate=ADSTOCK_SETTINGS['default_rate']):
+    # y[t] = x[t] + rate * y[t-1] is a first-order IIR filter
+    return lfilter([1.0], [1.0, -rate], np.asarray(series, dtype=float), axis=0)
+
+
+def adstock_grid(spend, rates=None):
+    """Geometric adstock of every channel at every rate, shaped (rates, periods, channels)."""
+    spend = _as_matrix(spend)
+    rates = ADSTOCK_SETTINGS['rates_grid'] if rates is None else rates
+
+    grid = np.empty((len(rates),) + spend.shape)
+    for i, rate in enumerate(rates):
+        grid[i] = lfilter([1.0], [1.0, -rate], spend, axis=0)
+    return grid
+
+
+def weibull_weights(shape, scale, max_lag=None, kind='cdf'):
+    lags = np.arange(max_lag or ADSTOCK_SETTINGS['weibull_max_lag'])
+
+    if kind == 'cdf':
+        # Survival curve: full weight in the period of spend, then a shape-controlled decay
+        return weibull_min.sf(lags, shape, scale=scale)
+    if kind == 'pdf':
+        # Delayed response that peaks after the spend; the strongest lag gets weight 1
+        weights = weibull_min.pdf(lags + 1, shape, scale=scale)
+        peak = weights.max()
+        return weights / peak if peak > 0 else weights
+
+    raise ValueError(f"Unknown Weibull adstock kind: {kind}")
+
+
+def weibull_adstock(series, shape, scale, max_lag=None, kind='cdf'):
+    weights = weibull_weights(shape, scale, max_lag, kind)
+    return lfilter(weights, [1.0], np.asarray(series, dtype=float), axis=0)
+
+
+def weibull_adstock_grid(spend, params, max_lag=None, kind='cdf'):
+    """Weibull adstock for every (shape, scale) pair, shaped (params, periods, channels)."""
+    spend = _as_matrix(spend)
+
+    grid = np.empty((len(params),) + spend.shape)
+    for i, (shape, scale) in enumerate(params):
+        grid[i] = lfilter(weibull_weights(shape, scale, max_lag, kind), [1.0], spend, axis=0)
+    return grid
@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from .config import STAGE2_FEATURES, ATTRIBUTION_SETTINGS
+from .scoring import SCORING_FEATURES, feature_matrix, get_registry, stage2_matrix
+
+CONTRIBUTION_COLUMNS = STAGE2_FEATURES + ['bias']
+
+
+def get_cache_dir():
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ATTRIBUTION_SETTINGS['directory'])
+
+
+def shap_contributions(booster, X2, batch_size=None):
+    """Exact TreeSHAP values from XGBoost's pred_contribs; the last column is the bias term."""
+    batch_size = batch_size or ATTRIBUTION_SETTINGS['batch_size']
+    contribs = np.empty((len(X2), X2.shape[1] + 1), dtype=np.float32)
+    for start in range(0, len(X2), batch_size):
+        batch = xgb.DMatrix(X2[start:start + batch_size], feature_names=booster.feature_names)
+        contribs[start:start + batch_size] = booster.predict(batch, pred_contribs=True)
+    return contribs
+
+
+def row_hashes(frame, week_column='week'):
+    return pd.util.hash_pandas_object(frame[[week_column] + SCORING_FEATURES], index=False).to_numpy()
+
+
+def _cache_file(cache_dir, model_version):
+    return os.path.join(cache_dir, f"attribution-{model_version}.npz")
+
+
+def _load_cache(path):
+    if not os.path.exists(path):
+        return np.empty(0, dtype=np.uint64), np.empty((0, len(CONTRIBUTION_COLUMNS)), dtype=np.float32)
+    with np.load(path) as data:
+        return data['row_hash'], data['contribs']
+
+
+def _save_cache(path, hashes, contribs):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+    np.savez(tmp_path, row_hash=hashes, contribs=contribs)
+    os.replace(tmp_path, path)
+
+
+def attribute_weeks(frame, week_column='week', registry=None, cache_dir=None):
+    """Per-week SHAP decomposition of the XGB stage-2 prediction (ln revenue).
+
+    Rows already attributed by this model version are read from the cache; only new or
+    changed rows are computed. Returns the attributions and how many rows were computed.
+    """
+    registry = registry or get_registry()
+    if 'xgb' not in registry['models']:
+        raise ValueError(f"XGB stage-2 model is not available: {registry['skipped'].get('xgb', 'unknown model')}")
+
+    path = _cache_file(cache_dir or get_cache_dir(), registry['version'])
+    cached_hashes, cached_contribs = _load_cache(path)
+    hashes = row_hashes(frame, week_column)
+
+    # Sorted cache hashes turn the lookup into a binary search per row
+    order = np.argsort(cached_hashes)
+    pos = np.searchsorted(cached_hashes, hashes, sorter=order)
+    pos = order[np.minimum(pos, len(order) - 1)] if len(order) else pos
+    known = (cached_hashes[pos] == hashes) if len(order) else np.zeros(len(hashes), dtype=bool)
+
+    contribs = np.empty((len(frame), len(CONTRIBUTION_COLUMNS)), dtype=np.float32)
+    contribs[known] = cached_contribs[pos[known]]
+
+    new = ~known
+    if new.any():
+        X2, _ = stage2_matrix(feature_matrix(frame.loc[new]), registry)
+        contribs[new] = shap_contributions(registry['models']['xgb'].get_booster(), X2)
+        new_hashes, first = np.unique(hashes[new], return_index=True)
+        try:
+            _save_cache(path, np.concatenate([cached_hashes, new_hashes]),
+                        np.concatenate([cached_contribs, contribs[new][first]]))
+        except OSError:
+            # Attributions are still returned; the next call recomputes them
+            pass
+
+    attributions = pd.DataFrame(contribs, columns=CONTRIBUTION_COLUMNS)
+    attributions.insert(0, week_column, frame[week_column].to_numpy())
+    attributions['pred_ln_revenue'] = contribs.sum(axis=1)
+    return attributions, int(new.sum())
+
+
+def driver_decomposition(attributions, week, week_column='week'):
+    # One week's contributions, largest absolute effect first
+    row = attributions.loc[attributions[week_column] == week, CONTRIBUTION_COLUMNS].iloc[0]
+    return row.reindex(row.abs().sort_values(ascending=False).index)
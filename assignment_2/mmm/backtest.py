@@ -0,0 +1,123 @@
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.linear_model import Ridge
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBRegressor
+
+from .config import SEED, STAGE2_FEATURES, MEDIATOR_PREDICTION, BACKTEST_SETTINGS
+from .parallel import worker_pool, parallel_imap
+
+try:
+    from lightgbm import LGBMRegressor
+except ImportError:
+    # Optional; the backtest then compares Ridge and XGBoost only
+    LGBMRegressor = None
+
+RESULT_DTYPE = [
+    ('fold', 'i4'),
+    ('split_start', 'i4'),
+    ('model', 'U32'),
+    ('rmse', 'f8'),
+    ('fit_seconds', 'f8'),
+    ('predict_seconds', 'f8')
+]
+
+# Set once per worker so each fold only receives its split point
+_backtest_state = {}
+
+
+def default_models(ridge_alpha=10.0):
+    # name -> (estimator, scale features first)
+    models = {
+        'ridge': (Ridge(alpha=ridge_alpha), True),
+        'xgb': (XGBRegressor(random_state=SEED, objective='reg:squarederror', verbosity=0), False)
+    }
+    if LGBMRegressor is not None:
+        models['lgb'] = (LGBMRegressor(random_state=SEED, verbosity=-1), False)
+    return models
+
+
+def walk_forward_splits(n_rows, min_train=None, horizon=None, step=None):
+    horizon = horizon or BACKTEST_SETTINGS['horizon']
+    step = step or BACKTEST_SETTINGS['step']
+    min_train = min_train or int(BACKTEST_SETTINGS['min_train_frac'] * n_rows)
+    return np.arange(min_train, n_rows - horizon, step)
+
+
+def _limit_threads(estimator, threads):
+    if threads is not None and 'n_jobs' in estimator.get_params():
+        estimator.set_params(n_jobs=threads)
+    return estimator
+
+
+def _init_backtest(X1, y1, X2, y2, stage1_model, models, horizon, mediator_col, threads):
+    _backtest_state.update(
+        X1=X1, y1=y1, X2=X2, y2=y2, stage1_model=stage1_model, horizon=horizon, mediator_col=mediator_col,
+        models={name: (_limit_threads(clone(est), threads), scaled) for name, (est, scaled) in models.items()}
+    )
+
+
+def _run_fold(split):
+    state = _backtest_state
+    train, test = slice(0, split), slice(split, split + state['horizon'])
+    X1, X2, y2 = state['X1'], state['X2'], state['y2']
+
+    # Stage 1 is refitted on the train window and its predictions replace the mediator column
+    s1 = clone(state['stage1_model']).fit(X1[train], state['y1'][train])
+    Xtr, Xte = X2[train].copy(), X2[test].copy()
+    Xtr[:, state['mediator_col']] = s1.predict(X1[train])
+    Xte[:, state['mediator_col']] = s1.predict(X1[test])
+
+    scaler = StandardScaler().fit(Xtr)
+    Xtr_s, Xte_s = scaler.transform(Xtr), scaler.transform(Xte)
+
+    rows = []
+    for name, (estimator, scaled) in state['models'].items():
+        model = clone(estimator)
+        start = time.perf_counter()
+        model.fit(Xtr_s if scaled else Xtr, y2[train])
+        fitted = time.perf_counter()
+        pred = model.predict(Xte_s if scaled else Xte)
+        done = time.perf_counter()
+        rmse = np.sqrt(np.mean((y2[test] - pred) ** 2))
+        rows.append((split, name, rmse, fitted - start, done - fitted))
+    return rows
+
+
+def run_backtest(X_stage1, y_stage1, X_stage2, y_stage2, stage1_model, models=None, splits=None, settings=None):
+    """Expanding-window backtest of the two-stage model, one row per (fold, model)."""
+    settings = {**BACKTEST_SETTINGS, **(settings or {})}
+    models = models or default_models()
+    splits = walk_forward_splits(len(X_stage2), horizon=settings['horizon'], step=settings['step']) if splits is None else splits
+
+    columns = list(X_stage2.columns) if hasattr(X_stage2, 'columns') else STAGE2_FEATURES
+    initargs = (
+        np.asarray(X_stage1, dtype=float),
+        np.asarray(y_stage1, dtype=float),
+        np.asarray(X_stage2, dtype=float),
+        np.asarray(y_stage2, dtype=float),
+        stage1_model,
+        models,
+        settings['horizon'],
+        columns.index(MEDIATOR_PREDICTION),
+        settings['model_threads'] if settings['executor'] is not None else None
+    )
+
+    results = np.zeros(len(splits) * len(models), dtype=RESULT_DTYPE)
+    with worker_pool(settings, _init_backtest, initargs) as pool:
+        # Folds are written into the preallocated table as soon as each one finishes
+        for fold, rows in enumerate(parallel_imap(_run_fold, splits, pool)):
+            for i, row in enumerate(rows):
+                results[fold * len(models) + i] = (fold,) + row
+
+    return pd.DataFrame(results)
+
+
+def backtest_table(results):
+    # Wide layout used in the notebook: one rmse_ln_<model> column per model
+    table = results.pivot(index='split_start', columns='model', values='rmse')
+    table.columns = [f'rmse_ln_{model}' for model in table.columns]
+    return table.reset_index()
@@ -0,0 +1,135 @@
+# Small constant added before taking logs of spend and revenue
+EPS = 1e-6
+
+SEED = 42
+
+# Paid channels that receive an adstock transform (google is the mediator)
+SPEND_CHANNELS = ['facebook_spend', 'tiktok_spend', 'instagram_spend', 'snapchat_spend', 'google_spend']
+
+# Carryover settings; Weibull scale is measured in periods
+ADSTOCK_SETTINGS = {
+    'default_rate': 0.5,
+    'rates_grid': [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8],
+    'weibull_max_lag': 13
+}
+
+TARGET = 'ln_revenue'
+
+# Non-media regressors used alongside the adstocked spend
+CONTROL_FEATURES = ['social_followers', 'price_dev', 'promotions_bin', 'emails_send', 'sms_send', 'week_sin', 'week_cos']
+
+# Feature pipeline (mmm.features): raw weekly columns copied through, columns that get a log,
+# spend lags and controls whose missing values mean zero. Rows without a full lag history,
+# or with other missing inputs, are dropped.
+FEATURE_SETTINGS = {
+    'time_column': 'week',
+    'passthrough': ['revenue'] + SPEND_CHANNELS + ['social_followers', 'average_price', 'emails_send', 'sms_send'],
+    'log_columns': ['revenue'] + SPEND_CHANNELS,
+    'lags': [1, 2, 3],
+    'fill_zero': ['emails_send', 'sms_send'],
+    'promotion_values': ['yes', 'true', '1']
+}
+
+# Decay-rate search: 'independent' tunes each channel with the others at the default rate,
+# 'coordinate' then keeps re-tuning one channel at a time against the current best rates.
+# Candidates are scored on a 'process' or 'thread' pool (None runs them sequentially).
+DECAY_SEARCH_SETTINGS = {
+    'mode': 'coordinate',
+    'rate_range': (0.01, 0.9),
+    'rate_step': 0.01,
+    'max_rounds': 5,
+    'n_splits': 4,
+    'ridge_alpha': 10.0,
+    'executor': 'process',
+    'max_workers': None,
+    'chunksize': 16
+}
+
+# Two-stage mediation: socials predict Google spend, which feeds the revenue model
+SOCIAL_FEATURES = ['ln_facebook_spend', 'ln_tiktok_spend', 'ln_instagram_spend', 'ln_snapchat_spend']
+MEDIATOR = 'ln_google_spend'
+MEDIATOR_PREDICTION = 'pred_ln_google'
+STAGE2_FEATURES = [MEDIATOR_PREDICTION, 'ln_google_spend_adstock'] + CONTROL_FEATURES
+
+# Expanding-window backtest: refit every `step` rows and score the next `horizon` rows.
+# Folds run on a 'process' or 'thread' pool (None runs them sequentially); boosting models
+# are limited to `model_threads` threads each so parallel folds do not oversubscribe cores.
+BACKTEST_SETTINGS = {
+    'min_train_frac': 0.5,
+    'horizon': 8,
+    'step': 4,
+    'executor': 'process',
+    'max_workers': None,
+    'model_threads': 1
+}
+
+# Training orchestrator: one set of expanding-window folds shared by every search.
+# Ridge alphas are scored from a single SVD per fold; boosting grids use successive halving
+# with the tree count as budget and pick n_estimators from the per-round test error.
+TRAINING_SETTINGS = {
+    'n_splits': 4,
+    'stage1_alphas': [0.1, 1.0, 10.0],
+    'stage2_alphas': [0.01, 0.1, 1.0, 10.0, 100.0],
+    'boosting_grids': {
+        'xgb': {'max_depth': [3, 6], 'learning_rate': [0.05, 0.2]},
+        'lgb': {'num_leaves': [31, 127], 'learning_rate': [0.05, 0.2]}
+    },
+    'halving_factor': 3,
+    'max_n_estimators': 200
+}
+
+# Pickled models scored by mmm.scoring (relative to assignment_2). Stage-2 models must accept
+# raw features: the XGB model, or a scaler + Ridge pipeline as saved by train_models.
+MODEL_REGISTRY = {
+    'directory': 'models',
+    'stage1': 'stage1_model_tuned.pkl',
+    'stage2': {
+        'xgb': 'stage2_xgb_model.pkl',
+        'ridge': 'stage2_ridge_model.pkl'
+    },
+    'default_stage2': 'xgb',
+    # Fitted feature-pipeline state (mean price, decay rates) written next to the models
+    'features': 'feature_pipeline.json'
+}
+
+# Local HTTP scoring endpoint: python -m mmm.server
+SCORING_SERVER = {
+    'host': '127.0.0.1',
+    'port': 8502
+}
+
+# Budget optimizer: allocations are enumerated in total_budget / grid_steps units, then refined
+# around the best one on a grid refine_factor times finer. Controls not given by the caller are
+# held at baseline_controls (roughly the middle of the training data); price_dev 0 is the fitted
+# mean price, and a caller may pass average_price instead.
+OPTIMIZER_SETTINGS = {
+    'grid_steps': 40,
+    'refine_factor': 4,
+    'top_k': 10,
+    'baseline_controls': {
+        'social_followers': 85000.0,
+        'price_dev': 0.0,
+        'promotions_bin': 0.0,
+        'emails_send': 0.0,
+        'sms_send': 30000.0,
+        'week_sin': 0.0,
+        'week_cos': 1.0
+    }
+}
+
+# Precomputed spend -> weekly revenue curves, one per channel with the others held at
+# base_spend. Stored next to the models and rebuilt when the model version changes.
+RESPONSE_CURVE_SETTINGS = {
+    'points': 512,
+    'max_spend': 200000.0,
+    'base_spend': 10000.0,
+    'saturation_share': 0.9,
+    'filename': 'response_curves.npz'
+}
+
+# TreeSHAP attributions for the XGB stage-2 model, cached per model version under
+# `directory` (relative to assignment_2) and keyed by a hash of each input row
+ATTRIBUTION_SETTINGS = {
+    'directory': '.cache/attribution',
+    'batch_size': 4096
+}
@@ -0,0 +1,31 @@
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+
+def expanding_folds(n_rows, n_splits):
+    # Same splits as TimeSeriesSplit(n_splits) without materialising index lists
+    test_size = n_rows // (n_splits + 1)
+    starts = range(n_rows - n_splits * test_size, n_rows, test_size)
+    return [(start, start + test_size) for start in starts]
+
+
+def fold_blocks(X, folds, scale=False):
+    blocks = []
+    for start, stop in folds:
+        Xtr, Xte = X[:start], X[start:stop]
+        if scale:
+            scaler = StandardScaler().fit(Xtr)
+            Xtr, Xte = scaler.transform(Xtr), scaler.transform(Xte)
+        blocks.append((Xtr, Xte))
+    return blocks
+
+
+def ridge_path_mse(Xtr, ytr, Xte, yte, alphas):
+    """Test MSE of Ridge(alpha, fit_intercept=True) for every alpha from one SVD."""
+    x_mean, y_mean = Xtr.mean(axis=0), ytr.mean()
+    U, s, Vt = np.linalg.svd(Xtr - x_mean, full_matrices=False)
+
+    shrink = s / (s ** 2 + np.asarray(alphas, dtype=float)[:, None])
+    coefs = (shrink * (U.T @ (ytr - y_mean))) @ Vt
+    pred = (Xte - x_mean) @ coefs.T + y_mean
+    return np.mean((yte[:, None] - pred) ** 2, axis=0)
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+from .adstock import adstock_grid
+from .cv import expanding_folds
+from .config import EPS, SPEND_CHANNELS, TARGET, CONTROL_FEATURES, ADSTOCK_SETTINGS, DECAY_SEARCH_SETTINGS
+from .parallel import worker_pool, parallel_map
+
+# Set once per worker so candidates only carry rate indices
+_search_state = {}
+
+
+def decay_rate_grid(rate_range=None, step=None):
+    low, high = rate_range or DECAY_SEARCH_SETTINGS['rate_range']
+    step = step or DECAY_SEARCH_SETTINGS['rate_step']
+    return np.round(np.arange(low, high + step / 2, step), 6)
+
+
+def _ridge_fold_rmse(X, y, start, stop, alpha):
+    # StandardScaler + Ridge(alpha) on the expanding train window, scored on the next block
+    Xtr, ytr = X[:start], y[:start]
+    mean, scale = Xtr.mean(axis=0), Xtr.std(axis=0)
+    scale[scale == 0] = 1.0
+
+    Xtr_s = (Xtr - mean) / scale
+    y_mean = ytr.mean()
+    coef = np.linalg.solve(Xtr_s.T @ Xtr_s + alpha * np.eye(X.shape[1]), Xtr_s.T @ (ytr - y_mean))
+
+    pred = ((X[start:stop] - mean) / scale) @ coef + y_mean
+    return np.sqrt(np.mean((y[start:stop] - pred) ** 2))
+
+
+def _init_search(ln_grid, controls, y, folds, alpha):
+    _search_state.update(ln_grid=ln_grid, controls=controls, y=y, folds=folds, alpha=alpha)
+
+
+def _score_candidate(rate_indices):
+    state = _search_state
+    media = state['ln_grid'][list(rate_indices), :, range(len(rate_indices))].T
+    X = np.hstack([media, state['controls']])
+    return float(np.mean([_ridge_fold_rmse(X, state['y'], start, stop, state['alpha']) for start, stop in state['folds']]))
+
+
+def _sweep_channel(current, channel_idx, rate_indices):
+    candidates = []
+    for rate_idx in rate_indices:
+        candidate = list(current)
+        candidate[channel_idx] = rate_idx
+        candidates.append(tuple(candidate))
+    return candidates
+
+
+def search_decay_rates(df, channels=None, controls=None, target=TARGET, rates=None, mode=None, settings=None):
+    """Tune one geometric decay rate per channel by expanding-window Ridge CV.
+
+    Returns the best rate per channel and a frame with every scored (round, channel, rate).
+    """
+    settings = {**DECAY_SEARCH_SETTINGS, **(settings or {})}
+    channels = channels or SPEND_CHANNELS
+    controls = CONTROL_FEATURES if controls is None else controls
+    mode = mode or settings['mode']
+    rates = decay_rate_grid() if rates is None else np.asarray(rates, dtype=float)
+    if mode not in ('independent', 'coordinate'):
+        raise ValueError(f"Unknown decay search mode: {mode}")
+
+    # Every channel is adstocked once per rate; candidates are index tuples into this grid
+    default_rate = ADSTOCK_SETTINGS['default_rate']
+    all_rates = np.union1d(rates, [default_rate])
+    spend = df[channels].fillna(0).to_numpy(dtype=float)
+    ln_grid = np.log(adstock_grid(spend, all_rates) + EPS)
+
+    rate_indices = np.searchsorted(all_rates, rates).tolist()
+    initargs = (
+        ln_grid,
+        df[controls].to_numpy(dtype=float),
+        df[target].to_numpy(dtype=float),
+        expanding_folds(len(df), settings['n_splits']),
+        settings['ridge_alpha']
+    )
+
+    scores = {}
+    history = []
+
+    def score_sweeps(pool, sweeps, round_no):
+        # Candidates already scored in an earlier sweep are not refitted
+        pending = list(dict.fromkeys(c for _, sweep in sweeps for c in sweep if c not in scores))
+        scores.update(zip(pending, parallel_map(_score_candidate, pending, pool, settings['chunksize'])))
+        for channel_idx, sweep in sweeps:
+            for candidate in sweep:
+                history.append({
+                    'round': round_no,
+                    'channel': channels[channel_idx],
+                    'rate': float(all_rates[candidate[channel_idx]]),
+                    'rmse': scores[candidate]
+                })
+        return [min(sweep, key=scores.get) for _, sweep in sweeps]
+
+    with worker_pool(settings, _init_search, initargs) as pool:
+        # Round 0 tunes each channel on its own with the others at the default rate
+        base = (int(np.searchsorted(all_rates, default_rate)),) * len(channels)
+        sweeps = [(i, _sweep_channel(base, i, rate_indices)) for i in range(len(channels))]
+        current = tuple(best[i] for i, best in enumerate(score_sweeps(pool, sweeps, 0)))
+
+        if mode == 'coordinate':
+            # The combined round-0 rates have not been scored together yet
+            if current not in scores:
+                scores[current] = parallel_map(_score_candidate, [current], pool)[0]
+            best_score = scores[current]
+            for round_no in range(1, settings['max_rounds'] + 1):
+                changed = False
+                for i in range(len(channels)):
+                    best = score_sweeps(pool, [(i, _sweep_channel(current, i, rate_indices))], round_no)[0]
+                    if scores[best] < best_score:
+                        current, best_score, changed = best, scores[best], True
+                if not changed:
+                    break
+
+    best_rates = {channel: float(all_rates[idx]) for channel, idx in zip(channels, current)}
+    return best_rates, pd.DataFrame(history)
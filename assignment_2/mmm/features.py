@@ -0,0 +1,139 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .adstock import adstock
+from .config import EPS, SPEND_CHANNELS, ADSTOCK_SETTINGS, FEATURE_SETTINGS, MODEL_REGISTRY
+
+
+def feature_columns(settings=None):
+    settings = settings or FEATURE_SETTINGS
+    columns = list(settings['passthrough'])
+    columns += [f'ln_{col}' for col in settings['log_columns']]
+    columns += [f'{ch}_lag{lag}' for lag in settings['lags'] for ch in SPEND_CHANNELS]
+    columns += ['week_of_year', 'week_sin', 'week_cos', 'promotions_bin', 'price_dev']
+    columns += [f'{ch}_adstock' for ch in SPEND_CHANNELS] + [f'ln_{ch}_adstock' for ch in SPEND_CHANNELS]
+    return columns
+
+
+def fit_features(df, adstock_rates=None, settings=None):
+    """Fitted state for transform_features: mean price and one decay rate per channel.
+
+    The state is a plain dict, so it can be saved with the models and reused at inference.
+    """
+    settings = {**FEATURE_SETTINGS, **(settings or {})}
+    adstock_rates = adstock_rates or {}
+    return {
+        'mean_price': float(df['average_price'].mean()),
+        'adstock_rates': {ch: float(adstock_rates.get(ch, ADSTOCK_SETTINGS['default_rate'])) for ch in SPEND_CHANNELS},
+        'settings': settings,
+        'columns': feature_columns(settings)
+    }
+
+
+def default_feature_state(settings=None):
+    """State for models saved without a fitted pipeline: default decay rates and no mean price."""
+    settings = {**FEATURE_SETTINGS, **(settings or {})}
+    return {
+        'mean_price': None,
+        'adstock_rates': {ch: float(ADSTOCK_SETTINGS['default_rate']) for ch in SPEND_CHANNELS},
+        'settings': settings,
+        'columns': feature_columns(settings)
+    }
+
+
+def _promotions(values, settings):
+    if values.dtype == object:
+        return values.astype(str).str.lower().isin(settings['promotion_values']).to_numpy(dtype=float)
+    return values.to_numpy(dtype=float)
+
+
+def transform_features(df, state):
+    """All model features in one pass, written into a single preallocated float block.
+
+    Returns a frame over that block (no per-column copies) with the time column added.
+    """
+    settings = state['settings']
+    columns = state['columns']
+    idx = {col: i for i, col in enumerate(columns)}
+    max_lag = max(settings['lags'], default=0)
+
+    raw = {col: df[col].to_numpy(dtype=float) for col in dict.fromkeys(settings['passthrough'] + settings['log_columns'])}
+    for col in settings['fill_zero']:
+        raw[col] = np.nan_to_num(raw[col], nan=0.0)
+    promotions = _promotions(df['promotions'], settings)
+
+    # Rows kept match the notebook's dropna after the lag shifts
+    keep = np.ones(len(df), dtype=bool)
+    keep[:max_lag] = False
+    for values in list(raw.values()) + [promotions]:
+        keep &= ~np.isnan(values)
+    for col in settings['log_columns']:
+        keep &= raw[col] + EPS >= 0
+    for lag in settings['lags']:
+        for ch in SPEND_CHANNELS:
+            keep[lag:] &= ~np.isnan(raw[ch][:-lag])
+    rows = np.flatnonzero(keep)
+
+    # Column-major, so every column is contiguous and pandas can wrap the block without copying
+    block = np.empty((len(rows), len(columns)), order='F')
+
+    def log_into(values, col):
+        out = block[:, idx[col]]
+        np.add(values, EPS, out=out)
+        np.log(out, out=out)
+
+    for col in settings['passthrough']:
+        np.take(raw[col], rows, out=block[:, idx[col]])
+    for col in settings['log_columns']:
+        log_into(raw[col][rows], f'ln_{col}')
+    for lag in settings['lags']:
+        for ch in SPEND_CHANNELS:
+            np.take(raw[ch], rows - lag, out=block[:, idx[f'{ch}_lag{lag}']])
+
+    weeks = pd.DatetimeIndex(df[settings['time_column']].to_numpy()[rows])
+    week_of_year = block[:, idx['week_of_year']]
+    week_of_year[:] = weeks.isocalendar().week.to_numpy()
+    np.sin(2 * np.pi * week_of_year / 52, out=block[:, idx['week_sin']])
+    np.cos(2 * np.pi * week_of_year / 52, out=block[:, idx['week_cos']])
+    np.take(promotions, rows, out=block[:, idx['promotions_bin']])
+    np.subtract(raw['average_price'][rows], state['mean_price'], out=block[:, idx['price_dev']])
+
+    for ch in SPEND_CHANNELS:
+        stock = block[:, idx[f'{ch}_adstock']]
+        stock[:] = adstock(raw[ch][rows], state['adstock_rates'][ch])
+        log_into(stock, f'ln_{ch}_adstock')
+
+    frame = pd.DataFrame(block, columns=columns, copy=False)
+    frame.insert(0, settings['time_column'], weeks)
+    return frame
+
+
+def inference_features(df, state):
+    """transform_features for scoring rows: revenue and spend lags are not model inputs, so a frame
+    may leave them out and no week is dropped for missing lag history.
+    """
+    settings = state['settings']
+    settings = dict(
+        settings,
+        passthrough=[col for col in settings['passthrough'] if col in df.columns],
+        log_columns=[col for col in settings['log_columns'] if col in df.columns],
+        lags=[]
+    )
+    return transform_features(df, dict(state, settings=settings, columns=feature_columns(settings)))
+
+
+def feature_state_path(model_dir):
+    return os.path.join(model_dir, MODEL_REGISTRY['features'])
+
+
+def save_feature_state(state, path):
+    with open(path, 'w') as f:
+        json.dump(state, f, indent=2)
+
+
+def load_feature_state(path):
+    with open(path) as f:
+        return json.load(f)
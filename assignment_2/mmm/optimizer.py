@@ -0,0 +1,172 @@
+import time
+from itertools import combinations, product
+
+import numpy as np
+import pandas as pd
+
+from .config import EPS, SPEND_CHANNELS, OPTIMIZER_SETTINGS
+from .features import inference_features
+from .scoring import SCORING_FEATURES, get_registry, score_matrix
+
+
+def allocation_grid(n_channels, steps):
+    """Every way to split `steps` budget units over n_channels, shaped (allocations, channels)."""
+    # Stars and bars: choosing n_channels - 1 bar positions among steps + n_channels - 1 slots
+    if n_channels == 1:
+        return np.array([[steps]])
+    slots = steps + n_channels - 1
+    bars = np.fromiter(
+        (i for combo in combinations(range(slots), n_channels - 1) for i in combo),
+        dtype=np.int64
+    ).reshape(-1, n_channels - 1)
+    edges = np.hstack([np.full((len(bars), 1), -1), bars, np.full((len(bars), 1), slots)])
+    return np.diff(edges, axis=1) - 1
+
+
+def _refine_grid(best, unit, n_channels, factor):
+    # Offsets of up to one coarse unit on every channel but the last, which takes the remainder
+    offsets = np.arange(-factor, factor + 1) * (unit / factor)
+    deltas = np.array(list(product(offsets, repeat=n_channels - 1)))
+    deltas = np.hstack([deltas, -deltas.sum(axis=1, keepdims=True)])
+    return best + deltas
+
+
+def feature_state(registry=None, adstock_rates=None):
+    """Fitted feature state saved with the models, with decay rates overridden per channel by adstock_rates."""
+    state = (registry or get_registry())['features']
+    return dict(state, adstock_rates={**state['adstock_rates'], **(adstock_rates or {})})
+
+
+def _price_dev(controls, features):
+    # A raw average_price is turned into a deviation from the fitted mean price; otherwise price_dev is used as given
+    if 'average_price' not in controls:
+        return controls['price_dev']
+    if features['mean_price'] is None:
+        raise ValueError("The models were saved without a fitted mean price; pass price_dev instead of average_price")
+    return np.asarray(controls['average_price'], dtype=float) - features['mean_price']
+
+
+def scenario_matrix(spend, controls=None, features=None):
+    """Scoring rows for steady weekly spend per channel (columns in SPEND_CHANNELS order)."""
+    features = features or feature_state()
+    controls = {**OPTIMIZER_SETTINGS['baseline_controls'], **(controls or {})}
+    controls['price_dev'] = _price_dev(controls, features)
+
+    columns = {}
+    for i, channel in enumerate(SPEND_CHANNELS):
+        columns[f'ln_{channel}'] = np.log(spend[:, i] + EPS)
+        # Constant spend x settles at x / (1 - rate) under geometric adstock
+        rate = features['adstock_rates'][channel]
+        columns[f'ln_{channel}_adstock'] = np.log(spend[:, i] / (1 - rate) + EPS)
+
+    X = np.empty((len(spend), len(SCORING_FEATURES)))
+    for col, feature in enumerate(SCORING_FEATURES):
+        X[:, col] = columns[feature] if feature in columns else controls[feature]
+    return X
+
+
+def spend_history_frame(weeks, spend, controls=None, features=None):
+    """Scoring rows for an observed weekly spend history, built by the fitted feature pipeline.
+
+    Controls are scalars or one value per week; adstock is carried across the weeks given.
+    """
+    features = features or feature_state()
+    controls = {**OPTIMIZER_SETTINGS['baseline_controls'], **(controls or {})}
+    mean_price = features['mean_price'] or 0.0
+
+    raw = pd.DataFrame({'week': pd.DatetimeIndex(weeks)})
+    raw[SPEND_CHANNELS] = np.asarray(spend, dtype=float)
+    for col in ['social_followers', 'emails_send', 'sms_send']:
+        raw[col] = controls[col]
+    raw['promotions'] = controls['promotions_bin']
+    raw['average_price'] = mean_price + _price_dev(controls, features)
+
+    frame = inference_features(raw, dict(features, mean_price=mean_price))
+    return frame[['week'] + SCORING_FEATURES]
+
+
+def predict_revenue(spend, controls=None, adstock_rates=None, stage2=None, registry=None):
+    registry = registry or get_registry()
+    X = scenario_matrix(spend, controls, feature_state(registry, adstock_rates))
+    ln_revenue, _ = score_matrix(X, stage2, registry)
+    return np.exp(ln_revenue)
+
+
+def _within_bounds(spend, total_budget, lower, upper):
+    return (
+        np.all(spend >= lower - 1e-9, axis=1)
+        & np.all(spend <= upper + 1e-9, axis=1)
+        & np.isclose(spend.sum(axis=1), total_budget)
+    )
+
+
+def _full_spend(budget_spend, channels, fixed_spend):
+    # Budget columns in SPEND_CHANNELS order, with the fixed channels filled in
+    spend = np.empty((len(budget_spend), len(SPEND_CHANNELS)))
+    for i, channel in enumerate(SPEND_CHANNELS):
+        spend[:, i] = budget_spend[:, channels.index(channel)] if channel in channels else fixed_spend[channel]
+    return spend
+
+
+def optimize_budget(total_budget, bounds=None, controls=None, adstock_rates=None, stage2=None,
+                    grid_steps=None, refine=True, registry=None, fixed_spend=None, reference=None):
+    """Revenue-maximising split of a weekly budget over SPEND_CHANNELS.
+
+    bounds maps a channel to (min, max) spend. Channels in fixed_spend are held at that weekly
+    spend outside the budget. Allocations with the same predicted revenue are ranked by how little
+    they move spend away from reference (e.g. the current mix). Every candidate allocation is
+    scored in one batched stage 1 -> stage 2 prediction.
+    """
+    start = time.perf_counter()
+    registry = registry or get_registry()
+    settings = OPTIMIZER_SETTINGS
+    grid_steps = grid_steps or settings['grid_steps']
+    bounds = bounds or {}
+    fixed_spend = fixed_spend or {}
+    channels = [ch for ch in SPEND_CHANNELS if ch not in fixed_spend]
+    if not channels:
+        raise ValueError("Every channel has a fixed spend; there is no budget to allocate")
+
+    lower = np.array([bounds.get(ch, (0.0, total_budget))[0] for ch in channels], dtype=float)
+    upper = np.array([bounds.get(ch, (0.0, total_budget))[1] for ch in channels], dtype=float)
+    if lower.sum() > total_budget or upper.sum() < total_budget:
+        raise ValueError("Channel bounds cannot be met with this total budget")
+
+    def score(budget_spend):
+        return predict_revenue(_full_spend(budget_spend, channels, fixed_spend), controls, adstock_rates, stage2, registry)
+
+    unit = total_budget / grid_steps
+    spend = allocation_grid(len(channels), grid_steps) * unit
+    spend = spend[_within_bounds(spend, total_budget, lower, upper)]
+    if not len(spend):
+        raise ValueError("No allocation on the grid satisfies the channel bounds; use more grid steps")
+
+    revenue = score(spend)
+    evaluated = len(spend)
+
+    if refine:
+        fine = _refine_grid(spend[np.argmax(revenue)], unit, len(channels), settings['refine_factor'])
+        fine = fine[_within_bounds(fine, total_budget, lower, upper)]
+        revenue = np.concatenate([revenue, score(fine)])
+        evaluated += len(fine)
+        # The fine grid repeats the coarse points it passes through
+        spend, keep = np.unique(np.vstack([spend, fine]), axis=0, return_index=True)
+        revenue = revenue[keep]
+
+    spend = _full_spend(spend, channels, fixed_spend)
+
+    # Tree models predict the same revenue over whole ranges of spend
+    moved = np.abs(spend - reference).sum(axis=1) if reference is not None else np.zeros(len(spend))
+    order = np.lexsort((moved, -revenue))[:settings['top_k']]
+    top = pd.DataFrame(spend[order], columns=SPEND_CHANNELS)
+    top['predicted_revenue'] = revenue[order]
+
+    best = order[0]
+    return {
+        'allocation': dict(zip(SPEND_CHANNELS, spend[best].tolist())),
+        'predicted_revenue': float(revenue[best]),
+        'top_allocations': top,
+        'candidates': evaluated,
+        'seconds': time.perf_counter() - start,
+        'model_version': registry['version']
+    }
@@ -0,0 +1,27 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+@contextmanager
+def worker_pool(settings, initializer=None, initargs=()):
+    # Yields None when settings['executor'] is None; parallel_map then runs in this process
+    if settings['executor'] is None:
+        if initializer is not None:
+            initializer(*initargs)
+        yield None
+        return
+
+    pool_class = ProcessPoolExecutor if settings['executor'] == 'process' else ThreadPoolExecutor
+    with pool_class(max_workers=settings['max_workers'], initializer=initializer, initargs=initargs) as pool:
+        yield pool
+
+
+def parallel_imap(fn, jobs, pool=None, chunksize=1):
+    if pool is None:
+        return (fn(job) for job in jobs)
+    # map yields results in submission order, so ties always resolve the same way
+    return pool.map(fn, jobs, chunksize=chunksize)
+
+
+def parallel_map(fn, jobs, pool=None, chunksize=1):
+    return list(parallel_imap(fn, jobs, pool, chunksize))
@@ -0,0 +1,106 @@
+"""Dense spend -> revenue response curves per channel, precomputed from the scoring registry.
+
+    python -m mmm.response_curves
+"""
+import os
+
+import numpy as np
+
+from .config import SPEND_CHANNELS, RESPONSE_CURVE_SETTINGS
+from .optimizer import predict_revenue
+from .scoring import get_model_dir, get_registry
+
+
+def build_response_curves(points=None, max_spend=None, base_spend=None, controls=None, stage2=None, registry=None):
+    registry = registry or get_registry()
+    settings = RESPONSE_CURVE_SETTINGS
+    points = points or settings['points']
+    max_spend = max_spend or settings['max_spend']
+    base_spend = settings['base_spend'] if base_spend is None else base_spend
+
+    spend = np.linspace(0.0, max_spend, points)
+
+    # One scenario block per channel, all scored in a single batch
+    scenarios = np.full((len(SPEND_CHANNELS), points, len(SPEND_CHANNELS)), base_spend)
+    for i in range(len(SPEND_CHANNELS)):
+        scenarios[i, :, i] = spend
+    revenue = predict_revenue(scenarios.reshape(-1, len(SPEND_CHANNELS)), controls, stage2=stage2, registry=registry)
+
+    return {
+        'channels': np.array(SPEND_CHANNELS),
+        'spend': spend,
+        'revenue': revenue.reshape(len(SPEND_CHANNELS), points).astype(np.float32),
+        'base_spend': np.float64(base_spend),
+        'model_version': np.array(registry['version'])
+    }
+
+
+def curves_path(model_dir=None):
+    return os.path.join(model_dir or get_model_dir(), RESPONSE_CURVE_SETTINGS['filename'])
+
+
+def save_response_curves(curves, path=None):
+    path = path or curves_path()
+    tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+    np.savez(tmp_path, **curves)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_response_curves(path=None, model_version=None):
+    # Returns None when the file is missing or was built from a different model version
+    path = path or curves_path()
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        curves = {key: data[key] for key in data.files}
+    if model_version is not None and str(curves['model_version']) != model_version:
+        return None
+    return curves
+
+
+def get_response_curves(registry=None):
+    registry = registry or get_registry()
+    curves = load_response_curves(model_version=registry['version'])
+    if curves is None:
+        curves = build_response_curves(registry=registry)
+        try:
+            save_response_curves(curves)
+        except OSError:
+            # A read-only models folder only costs a rebuild next time
+            pass
+    return curves
+
+
+def _curve(curves, channel):
+    return curves['revenue'][list(curves['channels']).index(channel)]
+
+
+def revenue_at(curves, channel, spend):
+    # np.interp binary-searches the sorted spend grid, O(log n) per query
+    return np.interp(spend, curves['spend'], _curve(curves, channel))
+
+
+def marginal_roas(curves, channel, spend, delta):
+    """Revenue returned per dollar by the next `delta` of spend on top of `spend`."""
+    return (revenue_at(curves, channel, np.add(spend, delta)) - revenue_at(curves, channel, spend)) / delta
+
+
+def saturation_spend(curves, channel, share=None):
+    # Spend at which the channel reaches `share` of the largest revenue gain on the curve
+    share = share or RESPONSE_CURVE_SETTINGS['saturation_share']
+    gain = np.maximum.accumulate(_curve(curves, channel) - _curve(curves, channel)[0])
+    if gain[-1] <= 0:
+        return None
+    return float(curves['spend'][np.searchsorted(gain, share * gain[-1])])
+
+
+def main():
+    curves = build_response_curves()
+    path = save_response_curves(curves)
+    print(f"Saved {len(curves['channels'])} curves x {len(curves['spend'])} points "
+          f"(models {curves['model_version']}) to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBRegressor
+
+from .config import SOCIAL_FEATURES, MEDIATOR_PREDICTION, STAGE2_FEATURES, MODEL_REGISTRY
+from .features import default_feature_state, feature_state_path, load_feature_state
+
+# Raw inputs per scenario row: the stage-1 socials plus every stage-2 feature except the mediator
+SCORING_FEATURES = SOCIAL_FEATURES + [f for f in STAGE2_FEATURES if f != MEDIATOR_PREDICTION]
+
+_registries = {}
+_registry_lock = threading.Lock()
+
+
+def get_model_dir():
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), MODEL_REGISTRY['directory'])
+
+
+def _model_paths(model_dir):
+    paths = {'stage1': os.path.join(model_dir, MODEL_REGISTRY['stage1'])}
+    for name, filename in MODEL_REGISTRY['stage2'].items():
+        paths[name] = os.path.join(model_dir, filename)
+    return paths
+
+
+def model_version(model_dir):
+    # The fitted feature state is part of the version: the same models with other decay rates score differently
+    paths = dict(_model_paths(model_dir), features=feature_state_path(model_dir))
+    signatures = []
+    for name, path in sorted(paths.items()):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            signatures.append([name, stat.st_size, stat.st_mtime_ns])
+    return hashlib.sha1(json.dumps(signatures).encode('utf-8')).hexdigest()[:12]
+
+
+def _linear_predictor(model):
+    # Ridge collapses to one matrix-vector product
+    coef, intercept = np.asarray(model.coef_, dtype=float), float(model.intercept_)
+    return lambda X: X @ coef + intercept
+
+
+def _scaled_linear_predictor(pipeline):
+    # The scaler folds into the coefficients: (X - mean) / scale @ coef == X @ (coef / scale) - const
+    scaler, ridge = pipeline[0], pipeline[-1]
+    coef = ridge.coef_ / scaler.scale_
+    intercept = float(ridge.intercept_ - scaler.mean_ @ coef)
+    return lambda X: X @ coef + intercept
+
+
+def _predictor(model):
+    if isinstance(model, XGBRegressor):
+        booster = model.get_booster()
+        return lambda X: booster.inplace_predict(X)
+    if isinstance(model, Ridge):
+        return _linear_predictor(model)
+    if isinstance(model, Pipeline) and isinstance(model[0], StandardScaler) and isinstance(model[-1], Ridge):
+        return _scaled_linear_predictor(model)
+    return model.predict
+
+
+def _accepts_raw_features(model):
+    # The notebook's stage-2 Ridge was fitted on standardized features without saving the scaler
+    return not isinstance(model, Ridge)
+
+
+def load_registry(model_dir=None):
+    model_dir = model_dir or get_model_dir()
+    paths = _model_paths(model_dir)
+
+    models = {'stage1': joblib.load(paths.pop('stage1'))}
+    stage2, skipped = {}, {}
+    for name, path in paths.items():
+        if not os.path.exists(path):
+            skipped[name] = 'file not found'
+            continue
+        model = joblib.load(path)
+        if _accepts_raw_features(model):
+            models[name] = model
+            stage2[name] = _predictor(model)
+        else:
+            skipped[name] = 'fitted on scaled features but saved without its scaler'
+
+    # Models saved before the feature pipeline have no fitted state; scoring then uses the default decay rates
+    features_path = feature_state_path(model_dir)
+    features = load_feature_state(features_path) if os.path.exists(features_path) else default_feature_state()
+
+    return {
+        'version': model_version(model_dir),
+        'model_dir': model_dir,
+        'models': models,
+        'features': features,
+        'stage1': _predictor(models['stage1']),
+        'stage2': stage2,
+        'skipped': skipped,
+        'loaded_at': time.time()
+    }
+
+
+def get_registry(model_dir=None):
+    # Models are unpickled once per version; a changed file on disk loads a new version
+    model_dir = model_dir or get_model_dir()
+    version = model_version(model_dir)
+    key = (os.path.abspath(model_dir), version)
+
+    with _registry_lock:
+        if key not in _registries:
+            for stale in [k for k in _registries if k[0] == key[0]]:
+                del _registries[stale]
+            _registries[key] = load_registry(model_dir)
+        return _registries[key]
+
+
+def feature_matrix(rows):
+    # Accepts a DataFrame, a list of row dicts, a dict of columns or an array in SCORING_FEATURES order
+    if isinstance(rows, np.ndarray):
+        return np.asarray(rows, dtype=float).reshape(-1, len(SCORING_FEATURES))
+    if isinstance(rows, dict):
+        return np.column_stack([np.asarray(rows[f], dtype=float) for f in SCORING_FEATURES])
+    if not isinstance(rows, pd.DataFrame):
+        rows = pd.DataFrame(list(rows))
+    missing = [f for f in SCORING_FEATURES if f not in rows.columns]
+    if missing:
+        raise ValueError(f"Missing scoring features: {missing}")
+    return rows[SCORING_FEATURES].to_numpy(dtype=float)
+
+
+_stage2_sources = [SCORING_FEATURES.index(f) if f != MEDIATOR_PREDICTION else None for f in STAGE2_FEATURES]
+
+
+def stage2_matrix(X, registry=None):
+    # Stage-2 features in STAGE2_FEATURES order, with the stage-1 prediction as the mediator
+    registry = registry or get_registry()
+    mediator = registry['stage1'](X[:, :len(SOCIAL_FEATURES)])
+
+    X2 = np.empty((len(X), len(STAGE2_FEATURES)))
+    for col, source in enumerate(_stage2_sources):
+        X2[:, col] = mediator if source is None else X[:, source]
+    return X2, mediator
+
+
+def score_matrix(X, stage2=None, registry=None):
+    """Stage 1 -> stage 2 chain on a (rows, SCORING_FEATURES) array; returns ln revenue and ln Google."""
+    registry = registry or get_registry()
+    stage2 = stage2 or MODEL_REGISTRY['default_stage2']
+    if stage2 not in registry['stage2']:
+        reason = registry['skipped'].get(stage2, 'unknown model')
+        raise ValueError(f"Stage-2 model '{stage2}' is not available: {reason}")
+
+    X2, mediator = stage2_matrix(X, registry)
+    return registry['stage2'][stage2](X2), mediator
+
+
+def score_batch(rows, stage2=None, registry=None):
+    start = time.perf_counter()
+    registry = registry or get_registry()
+    X = feature_matrix(rows)
+    prepared = time.perf_counter()
+
+    prediction, mediator = score_matrix(X, stage2, registry)
+    done = time.perf_counter()
+
+    return {
+        'model_version': registry['version'],
+        'stage2': stage2 or MODEL_REGISTRY['default_stage2'],
+        'pred_ln_revenue': prediction,
+        MEDIATOR_PREDICTION: mediator,
+        'latency': {
+            'rows': len(X),
+            'prepare_ms': (prepared - start) * 1000,
+            'predict_ms': (done - prepared) * 1000,
+            'total_ms': (done - start) * 1000,
+            'rows_per_second': len(X) / (done - start) if done > start else None
+        }
+    }
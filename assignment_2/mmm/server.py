@@ -0,0 +1,80 @@
+"""Local HTTP endpoint for batch scoring.
+
+    python -m mmm.server --port 8502
+
+POST /score  {"rows": [{feature: value, ...}, ...], "model": "xgb"}
+             or {"columns": {feature: [values], ...}}
+GET  /health model version and available stage-2 models
+"""
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .config import MEDIATOR_PREDICTION, SCORING_SERVER
+from .scoring import get_registry, score_batch
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send_json(404, {'error': 'not found'})
+            return
+        registry = get_registry()
+        self._send_json(200, {
+            'model_version': registry['version'],
+            'stage2_models': sorted(registry['stage2']),
+            'skipped': registry['skipped']
+        })
+
+    def do_POST(self):
+        if self.path != '/score':
+            self._send_json(404, {'error': 'not found'})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            rows = request['columns'] if 'columns' in request else request['rows']
+            result = score_batch(rows, request.get('model'))
+        except (KeyError, ValueError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+
+        for key in ('pred_ln_revenue', MEDIATOR_PREDICTION):
+            result[key] = result[key].tolist()
+        self._send_json(200, result)
+
+    def log_message(self, format, *args):
+        # Keep the console quiet under load; errors are still returned to the client
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve batch MMM scoring over HTTP')
+    parser.add_argument('--host', default=SCORING_SERVER['host'])
+    parser.add_argument('--port', type=int, default=SCORING_SERVER['port'])
+    args = parser.parse_args()
+
+    # Load the models before accepting requests so the first call does not pay for unpickling
+    registry = get_registry()
+    print(f"Models {registry['version']} loaded; stage-2: {', '.join(sorted(registry['stage2']))}")
+
+    server = ThreadingHTTPServer((args.host, args.port), ScoringHandler)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import math
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import ParameterGrid
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBRegressor
+
+from .backtest import default_models
+from .config import SOCIAL_FEATURES, MEDIATOR, MEDIATOR_PREDICTION, STAGE2_FEATURES, TARGET, TRAINING_SETTINGS
+from .cv import expanding_folds, fold_blocks, ridge_path_mse
+
+
+def search_ridge_alpha(blocks, y, folds, alphas):
+    # Mean test MSE per alpha over the shared folds, the same criterion GridSearchCV uses
+    mse = np.mean([
+        ridge_path_mse(Xtr, y[:start], Xte, y[start:stop], alphas)
+        for (Xtr, Xte), (start, stop) in zip(blocks, folds)
+    ], axis=0)
+    results = pd.DataFrame({'alpha': alphas, 'mean_test_mse': mse})
+    return float(alphas[int(np.argmin(mse))]), results
+
+
+def _test_mse_curve(model, Xtr, ytr, Xte, yte):
+    # Test error after every boosting round from a single fit, so n_estimators needs no refits
+    if isinstance(model, XGBRegressor):
+        model.set_params(eval_metric='rmse').fit(Xtr, ytr, eval_set=[(Xte, yte)], verbose=False)
+        return np.square(model.evals_result()['validation_0']['rmse'])
+    model.fit(Xtr, ytr, eval_set=[(Xte, yte)], eval_metric='l2')
+    return np.asarray(model.evals_result_['valid_0']['l2'])
+
+
+def search_boosting(estimator, param_grid, blocks, y, folds, settings):
+    """Successive halving over param_grid with the number of trees as the budget.
+
+    Every rung fits the surviving candidates once per fold and keeps the best 1/factor,
+    scored at their best boosting round. Returns the best params and all rung scores.
+    """
+    candidates = list(ParameterGrid(param_grid))
+    factor = settings['halving_factor']
+    n_rungs = math.ceil(math.log(len(candidates), factor)) + 1 if len(candidates) > 1 else 1
+
+    rows = []
+    for rung in range(n_rungs):
+        n_estimators = max(1, settings['max_n_estimators'] // factor ** (n_rungs - 1 - rung))
+        scored = []
+        for params in candidates:
+            model = clone(estimator).set_params(**params, n_estimators=n_estimators)
+            curve = np.mean([
+                _test_mse_curve(model, Xtr, y[:start], Xte, y[start:stop])
+                for (Xtr, Xte), (start, stop) in zip(blocks, folds)
+            ], axis=0)
+            best_round = int(np.argmin(curve))
+            scored.append((curve[best_round], best_round + 1, params))
+            rows.append({'rung': rung, 'budget': n_estimators, 'params': params,
+                         'best_n_estimators': best_round + 1, 'mean_test_mse': curve[best_round]})
+
+        scored.sort(key=lambda item: item[0])
+        candidates = [params for _, _, params in scored[:max(1, math.ceil(len(scored) / factor))]]
+
+    _, best_n_estimators, best_params = scored[0]
+    return {**best_params, 'n_estimators': best_n_estimators}, pd.DataFrame(rows)
+
+
+def train_models(df, settings=None):
+    """Fit stage 1, the stage-2 Ridge pipeline and the boosting models on shared CV folds."""
+    settings = {**TRAINING_SETTINGS, **(settings or {})}
+    folds = expanding_folds(len(df), settings['n_splits'])
+
+    trained = {'params': {}, 'cv_results': {}}
+
+    # Stage 1: socials -> Google spend, unscaled Ridge like the original grid1
+    X1 = df[SOCIAL_FEATURES].to_numpy(dtype=float)
+    y1 = df[MEDIATOR].to_numpy(dtype=float)
+    alpha, trained['cv_results']['stage1'] = search_ridge_alpha(fold_blocks(X1, folds), y1, folds, settings['stage1_alphas'])
+    trained['stage1'] = Ridge(alpha=alpha).fit(df[SOCIAL_FEATURES], y1)
+    trained['params']['stage1'] = {'alpha': alpha}
+
+    X2_frame = df.assign(**{MEDIATOR_PREDICTION: trained['stage1'].predict(df[SOCIAL_FEATURES])})[STAGE2_FEATURES]
+    X2 = X2_frame.to_numpy(dtype=float)
+    y2 = df[TARGET].to_numpy(dtype=float)
+
+    # Stage 2 Ridge is scaled per fold and saved together with its scaler
+    alpha, trained['cv_results']['stage2_ridge'] = search_ridge_alpha(
+        fold_blocks(X2, folds, scale=True), y2, folds, settings['stage2_alphas']
+    )
+    trained['stage2_ridge'] = make_pipeline(StandardScaler(), Ridge(alpha=alpha)).fit(X2_frame, y2)
+    trained['params']['stage2_ridge'] = {'alpha': alpha}
+
+    # Boosting models share the unscaled fold blocks
+    blocks = fold_blocks(X2, folds)
+    for name, (estimator, _) in default_models().items():
+        if name not in settings['boosting_grids']:
+            continue
+        params, trained['cv_results'][f'stage2_{name}'] = search_boosting(
+            estimator, settings['boosting_grids'][name], blocks, y2, folds, settings
+        )
+        trained[f'stage2_{name}'] = clone(estimator).set_params(**params).fit(X2_frame, y2)
+        trained['params'][f'stage2_{name}'] = params
+
+    return trained
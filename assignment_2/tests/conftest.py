@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the mmm package the way the notebook and benchmarks do, from assignment_2
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,63 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mmm.config import SPEND_CHANNELS, MODEL_REGISTRY
+from mmm.features import fit_features, transform_features, save_feature_state, feature_state_path
+from mmm.optimizer import feature_state, spend_history_frame, scenario_matrix
+from mmm.scoring import SCORING_FEATURES, get_model_dir, load_registry
+
+RATES = {ch: 0.2 + 0.15 * i for i, ch in enumerate(SPEND_CHANNELS)}
+
+
+@pytest.fixture
+def raw_weeks():
+    rng = np.random.default_rng(0)
+    periods = 60
+    df = pd.DataFrame({'week': pd.date_range('2023-01-01', periods=periods, freq='W')})
+    df[SPEND_CHANNELS] = rng.lognormal(8.0, 1.0, (periods, len(SPEND_CHANNELS)))
+    df['social_followers'] = 1000.0 + np.cumsum(rng.integers(0, 100, periods))
+    df['average_price'] = 50 + rng.normal(0, 3, periods)
+    df['promotions'] = rng.integers(0, 2, periods)
+    df['emails_send'] = rng.integers(0, 10000, periods).astype(float)
+    df['sms_send'] = rng.integers(0, 5000, periods).astype(float)
+    df['revenue'] = rng.lognormal(10.0, 0.3, periods)
+    return df
+
+
+def test_inference_features_match_training(raw_weeks):
+    state = fit_features(raw_weeks, RATES)
+    expected = transform_features(raw_weeks, state)[['week'] + SCORING_FEATURES]
+
+    # Training drops the weeks without a full lag history, so adstock starts after them
+    history = raw_weeks.iloc[max(state['settings']['lags']):]
+    controls = {col: history[col].to_numpy() for col in ['social_followers', 'emails_send', 'sms_send', 'average_price']}
+    controls['promotions_bin'] = history['promotions'].to_numpy()
+    actual = spend_history_frame(history['week'], history[SPEND_CHANNELS].to_numpy(), controls, state)
+
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def test_registry_loads_saved_state(raw_weeks, tmp_path):
+    model_dir = get_model_dir()
+    for filename in [MODEL_REGISTRY['stage1']] + list(MODEL_REGISTRY['stage2'].values()):
+        shutil.copy(os.path.join(model_dir, filename), tmp_path)
+    default = load_registry(str(tmp_path))
+    assert default['features']['mean_price'] is None
+
+    state = fit_features(raw_weeks, RATES)
+    save_feature_state(state, feature_state_path(str(tmp_path)))
+    registry = load_registry(str(tmp_path))
+
+    assert registry['features'] == state
+    assert registry['version'] != default['version']
+
+    # Scenario rows default to the saved decay rates and mean price
+    X = scenario_matrix(np.full((1, len(SPEND_CHANNELS)), 1000.0), {'average_price': state['mean_price'] + 2},
+                        feature_state(registry))
+    row = dict(zip(SCORING_FEATURES, X[0]))
+    assert row['price_dev'] == pytest.approx(2.0)
+    assert row['ln_google_spend_adstock'] == pytest.approx(np.log(1000.0 / (1 - RATES['google_spend'])))
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from mmm.config import SPEND_CHANNELS
+from mmm.optimizer import optimize_budget
+
+FIXED = {'instagram_spend': 10000.0, 'snapchat_spend': 10000.0}
+
+
+def test_fixed_channels_are_held_outside_the_budget():
+    result = optimize_budget(30000.0, {'google_spend': (3000.0, 30000.0)}, fixed_spend=FIXED, grid_steps=20)
+    allocation = result['allocation']
+
+    for channel, spend in FIXED.items():
+        assert allocation[channel] == spend
+        assert (result['top_allocations'][channel] == spend).all()
+    assert sum(allocation[ch] for ch in SPEND_CHANNELS if ch not in FIXED) == pytest.approx(30000.0)
+    assert allocation['google_spend'] >= 3000.0
+
+
+def test_ties_rank_the_smallest_move_from_the_reference_first():
+    reference = np.array([FIXED.get(ch, 10000.0) for ch in SPEND_CHANNELS])
+    top = optimize_budget(30000.0, fixed_spend=FIXED, grid_steps=20, reference=reference)['top_allocations']
+
+    moved = np.abs(top[SPEND_CHANNELS].to_numpy() - reference).sum(axis=1)
+    revenue = top['predicted_revenue'].to_numpy()
+    assert (np.diff(revenue) <= 0).all()
+    ties = revenue[1:] == revenue[:-1]
+    assert (np.diff(moved)[ties] >= 0).all()
+    assert not top.duplicated(SPEND_CHANNELS).any()